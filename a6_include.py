@@ -103,11 +103,16 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash_value: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash_value caches the full hash of key so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash_value = hash_value
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -138,6 +143,31 @@ class LinkedListIterator:
         return current_node
 
 
+class HashMapIterator:
+    """
+    Separate iterator class for the HashMaps, so each loop over a map keeps its own position
+    """
+
+    def __init__(self, hash_map, entries) -> None:
+        """
+        Initialize the iterator with a map and a generator over its entries.
+        The map's modification count is remembered to detect changes made during iteration.
+        """
+        self._hash_map = hash_map
+        self._entries = entries
+        self._modifications = hash_map._modifications
+
+    def __iter__(self) -> "HashMapIterator":
+        """Return the iterator."""
+        return self
+
+    def __next__(self):
+        """Obtain next entry and advance iterator."""
+        if self._hash_map._modifications != self._modifications:
+            raise RuntimeError("hash map changed during iteration")
+        return next(self._entries)
+
+
 class LinkedList:
     """
     Class implementing a Singly Linked List
@@ -168,20 +198,22 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash_value: int = None) -> None:
+        """Insert new node at front of the list, caching the key's hash."""
+        self._head = SLNode(key, value, self._head, hash_value)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash_value: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash_value is given, nodes with a different cached hash are skipped
+        without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash_value is None or node.hash_value == hash_value) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +224,15 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash_value: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash_value is given, nodes with a different cached hash are skipped
+        without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash_value is None or node.hash_value == hash_value) and node.key == key:
                 return node
             node = node.next
         return node
@@ -210,10 +246,14 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash_value: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash_value caches the full hash of key so it never has to be recomputed.
+        """
         self.key = key
         self.value = value
+        self.hash_value = hash_value
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,228 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Benchmark suite for the HashMap implementations, hash functions and find_mode.
+#
+#              For every combination of map implementation, hash function and key distribution it measures put, get,
+#              contains_key (hits and misses), remove, resize_table and get_keys_and_values, plus find_mode for each
+#              key distribution. Each operation is reported as operations per second and latency percentiles in
+#              microseconds, and each map also reports its peak memory use while being filled. Results are printed
+#              (or written) as JSON.
+#
+#              Usage: python benchmark.py [--count N] [--maps sc oa ...] [--functions hash_function_1 ...]
+#                                         [--distributions sequential ...] [--seed S] [--output results.json]
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from a6_include import DynamicArray
+from hash_functions import HASH_FUNCTIONS
+from hash_map_compact import CompactHashMap
+from hash_map_cuckoo import CuckooHashMap
+from hash_map_oa import HashMap as OpenAddressingHashMap
+from hash_map_pow2 import PowerOfTwoHashMap
+from hash_map_rh import RobinHoodHashMap
+from hash_map_sc import HashMap as SeparateChainingHashMap
+from hash_map_sc import IncrementalHashMap, find_mode
+from hash_map_swiss import SwissHashMap
+
+MAP_CLASSES = {
+    'sc': SeparateChainingHashMap,
+    'sc_incremental': IncrementalHashMap,
+    'oa': OpenAddressingHashMap,
+    'oa_compact': CompactHashMap,
+    'oa_robin_hood': RobinHoodHashMap,
+    'oa_pow2': PowerOfTwoHashMap,
+    'oa_swiss': SwissHashMap,
+    'cuckoo': CuckooHashMap,
+}
+
+# Number of times whole-table operations (resize_table, get_keys_and_values) are repeated
+WHOLE_TABLE_REPEATS = 5
+
+
+def sequential_keys(count: int, rng: random.Random) -> list:
+    """Returns count keys of the form 'str' + i, as used in the assignment examples"""
+    return ['str' + str(i) for i in range(count)]
+
+
+def random_keys(count: int, rng: random.Random) -> list:
+    """Returns count distinct random alphanumeric keys of length 12"""
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789'
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choices(alphabet, k=12)))
+    return list(keys)
+
+
+def anagram_keys(count: int, rng: random.Random) -> list:
+    """Returns count distinct permutations of the same letters, which all collide under hash_function_1"""
+    return [''.join(p) for p in itertools.islice(itertools.permutations('abcdefghijkl'), count)]
+
+
+def zipf_keys(count: int, rng: random.Random, exponent: float = 1.1) -> list:
+    """
+    Returns count keys drawn from a universe of count distinct keys with Zipfian frequencies, so a few keys repeat
+    very often and most keys appear rarely or not at all
+    """
+    universe = ['str' + str(i) for i in range(count)]
+    weights = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    return rng.choices(universe, weights=weights, k=count)
+
+
+DISTRIBUTIONS = {
+    'sequential': sequential_keys,
+    'random': random_keys,
+    'anagrams': anagram_keys,
+    'zipf': zipf_keys,
+}
+
+
+def summarize(latencies: list) -> dict:
+    """
+    Returns operations per second and latency percentiles (in microseconds) for a list of latencies in seconds
+    """
+    if not latencies:
+        return {'operations': 0}
+
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1e6, 3)
+
+    return {
+        'operations': len(ordered),
+        'ops_per_sec': round(len(ordered) / total, 1) if total else None,
+        'p50_us': percentile(0.50),
+        'p90_us': percentile(0.90),
+        'p99_us': percentile(0.99),
+        'max_us': round(ordered[-1] * 1e6, 3),
+    }
+
+
+def time_each(operation, arguments) -> list:
+    """
+    Calls operation once per item of arguments and returns the latency of each call in seconds
+    """
+    clock = time.perf_counter
+    latencies = []
+    for argument in arguments:
+        start = clock()
+        operation(*argument)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def peak_memory(map_class, function, keys: list) -> int:
+    """
+    Returns the peak number of bytes allocated while putting every key into a new map
+    """
+    tracemalloc.start()
+    m = map_class(11, function)
+    for i in range(len(keys)):
+        m.put(keys[i], i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark_map(map_class, function, keys: list) -> dict:
+    """
+    Benchmarks every operation of one map implementation and hash function over the given keys
+
+    Returns:
+        results: dict - one summarize() result per operation, plus size, capacity and peak_memory_bytes
+    """
+    misses = ['miss' + key for key in keys]
+    m = map_class(11, function)
+
+    results = {'put': summarize(time_each(m.put, [(keys[i], i) for i in range(len(keys))]))}
+    results['get'] = summarize(time_each(m.get, [(key,) for key in keys]))
+    results['contains_key_hit'] = summarize(time_each(m.contains_key, [(key,) for key in keys]))
+    results['contains_key_miss'] = summarize(time_each(m.contains_key, [(key,) for key in misses]))
+
+    # Alternate between growing and returning to the original capacity
+    capacity = m.get_capacity()
+    results['resize_table'] = summarize(time_each(m.resize_table, [(capacity * (2 if repeat % 2 == 0 else 1),)
+                                                                   for repeat in range(WHOLE_TABLE_REPEATS)]))
+    results['get_keys_and_values'] = summarize(time_each(m.get_keys_and_values, [()] * WHOLE_TABLE_REPEATS))
+
+    results['size'] = m.get_size()
+    results['capacity'] = m.get_capacity()
+    results['remove'] = summarize(time_each(m.remove, [(key,) for key in keys]))
+    results['peak_memory_bytes'] = peak_memory(map_class, function, keys)
+
+    return results
+
+
+def benchmark_find_mode(keys: list) -> dict:
+    """
+    Benchmarks find_mode over a dynamic array of the given keys
+    """
+    da = DynamicArray(keys)
+    results = summarize(time_each(find_mode, [(da,)] * WHOLE_TABLE_REPEATS))
+    results['elements_per_sec'] = round(results['ops_per_sec'] * len(keys), 1) if results['ops_per_sec'] else None
+    return results
+
+
+def run(count: int, maps: list, functions: list, distributions: list, seed: int = 0) -> dict:
+    """
+    Runs the benchmark suite and returns the results as a JSON serializable dictionary
+    """
+    report = {
+        'python': sys.version.split()[0],
+        'count': count,
+        'seed': seed,
+        'maps': {},
+        'find_mode': {},
+    }
+
+    for distribution in distributions:
+        keys = DISTRIBUTIONS[distribution](count, random.Random(seed))
+
+        # Zipfian keys repeat, so some puts are overwrites and the map ends up smaller than count
+        distinct_keys = list(dict.fromkeys(keys))
+
+        for map_name in maps:
+            for function_name in functions:
+                results = benchmark_map(MAP_CLASSES[map_name], HASH_FUNCTIONS[function_name], keys)
+                if len(distinct_keys) != len(keys):
+                    results['distinct_keys'] = len(distinct_keys)
+                report['maps'].setdefault(map_name, {}).setdefault(function_name, {})[distribution] = results
+
+        report['find_mode'][distribution] = benchmark_find_mode(keys)
+
+    return report
+
+
+def main(argv: list = None) -> None:
+    """
+    Parses command line arguments, runs the benchmark suite and writes the JSON report
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the HashMap implementations')
+    parser.add_argument('--count', type=int, default=2000, help='number of keys per run')
+    parser.add_argument('--maps', nargs='+', choices=list(MAP_CLASSES), default=list(MAP_CLASSES))
+    parser.add_argument('--functions', nargs='+', choices=list(HASH_FUNCTIONS),
+                        default=['hash_function_1', 'hash_function_2'])
+    parser.add_argument('--distributions', nargs='+', choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report to this file instead of standard output')
+    args = parser.parse_args(argv)
+
+    report = run(args.count, args.maps, args.functions, args.distributions, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Additional hash functions for use with both HashMaps (SC & OA).
+#
+#              Every function takes a string key and returns a non-negative integer, so each one can be passed to
+#              HashMap(capacity, function) in place of hash_function_1 or hash_function_2.
+#
+#              It includes the following public functions:
+#
+#              hash_function_fnv1a(key) - 64-bit FNV-1a over the UTF-8 bytes of the key
+#              hash_function_murmur(key) - 64-bit murmur/xxhash-style block mixer with a murmur3 finalizer
+#              make_siphash_function(seed) - Returns a keyed SipHash-2-4 hash function using the given 16 byte seed
+#              distribution_report(function, keys, capacity) - Returns bucket distribution and throughput measurements
+#                                                              for one hash function over the given keys
+#              compare_hash_functions(keys, capacity, functions) - Returns a distribution_report for each function
+#              hash_function_name(function) - Returns the HASH_FUNCTIONS name of function, or None
+#              select_hash_function(keys, capacity, functions, current) - Returns current if it spreads the given
+#                                                                         keys about as well as a random function, or
+#                                                                         else the function spreading them most evenly
+#
+#              HASH_FUNCTIONS maps a short name to each unkeyed hash function available to the HashMaps.
+
+import math
+import os
+import time
+
+from a6_include import hash_function_1, hash_function_2
+
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+_FNV_OFFSET_BASIS = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+
+_MURMUR_SEED = 0x9E3779B97F4A7C15
+_MURMUR_C1 = 0x87C37B91114253D5
+_MURMUR_C2 = 0x4CF5AD432745937F
+
+
+def _rotate_left(value: int, bits: int) -> int:
+    """Rotate a 64-bit integer left by the given number of bits"""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def _finalize(hash: int) -> int:
+    """murmur3 fmix64 finalizer: forces every input bit to affect every output bit"""
+    hash ^= hash >> 33
+    hash = (hash * 0xFF51AFD7ED558CCD) & _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xC4CEB9FE1A85EC53) & _MASK_64
+    hash ^= hash >> 33
+    return hash
+
+
+def hash_function_fnv1a(key: str) -> int:
+    """64-bit FNV-1a hash function to be used with HashMap implementation"""
+    hash = _FNV_OFFSET_BASIS
+    for byte in key.encode():
+        hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash
+
+
+def hash_function_murmur(key: str) -> int:
+    """
+    64-bit murmur/xxhash-style hash function to be used with HashMap implementation.
+    Consumes the key eight bytes at a time, so it runs far fewer interpreted steps than the per-character functions.
+    """
+    data = key.encode()
+    length = len(data)
+    hash = _MURMUR_SEED ^ length
+    block_end = length - length % 8
+
+    for offset in range(0, block_end, 8):
+        block = int.from_bytes(data[offset:offset + 8], 'little')
+        block = _rotate_left((block * _MURMUR_C1) & _MASK_64, 31)
+        hash ^= (block * _MURMUR_C2) & _MASK_64
+        hash = (_rotate_left(hash, 27) * 5 + 0x52DCE729) & _MASK_64
+
+    # Mix in the remaining zero to seven bytes
+    if block_end < length:
+        block = int.from_bytes(data[block_end:], 'little')
+        block = _rotate_left((block * _MURMUR_C1) & _MASK_64, 31)
+        hash ^= (block * _MURMUR_C2) & _MASK_64
+
+    return _finalize(hash)
+
+
+def _siphash_2_4(k0: int, k1: int, data: bytes) -> int:
+    """SipHash-2-4 of data under the 128-bit key (k0, k1)"""
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    length = len(data)
+    block_end = length - length % 8
+    last_block = ((length & 0xFF) << 56) | int.from_bytes(data[block_end:], 'little')
+
+    offset = 0
+    while True:
+        if offset < block_end:
+            block = int.from_bytes(data[offset:offset + 8], 'little')
+        else:
+            block = last_block
+
+        v3 ^= block
+        for _ in range(2):
+            v0 = (v0 + v1) & _MASK_64
+            v1 = _rotate_left(v1, 13) ^ v0
+            v0 = _rotate_left(v0, 32)
+            v2 = (v2 + v3) & _MASK_64
+            v3 = _rotate_left(v3, 16) ^ v2
+            v0 = (v0 + v3) & _MASK_64
+            v3 = _rotate_left(v3, 21) ^ v0
+            v2 = (v2 + v1) & _MASK_64
+            v1 = _rotate_left(v1, 17) ^ v2
+            v2 = _rotate_left(v2, 32)
+        v0 ^= block
+
+        if offset >= block_end:
+            break
+        offset += 8
+
+    v2 ^= 0xFF
+    for _ in range(4):
+        v0 = (v0 + v1) & _MASK_64
+        v1 = _rotate_left(v1, 13) ^ v0
+        v0 = _rotate_left(v0, 32)
+        v2 = (v2 + v3) & _MASK_64
+        v3 = _rotate_left(v3, 16) ^ v2
+        v0 = (v0 + v3) & _MASK_64
+        v3 = _rotate_left(v3, 21) ^ v0
+        v2 = (v2 + v1) & _MASK_64
+        v1 = _rotate_left(v1, 17) ^ v2
+        v2 = _rotate_left(v2, 32)
+
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def make_siphash_function(seed: bytes = None) -> callable:
+    """
+    Returns a keyed SipHash-2-4 hash function to be used with HashMap implementation.
+
+    Args:
+        seed: bytes - 16 byte secret key. A random key is generated if no seed is given.
+
+    Returns:
+        function - hash function mapping a string key to a 64-bit integer
+    """
+    if seed is None:
+        seed = os.urandom(16)
+    if len(seed) != 16:
+        raise ValueError("SipHash seed must be exactly 16 bytes")
+
+    k0 = int.from_bytes(seed[:8], 'little')
+    k1 = int.from_bytes(seed[8:], 'little')
+
+    def hash_function_siphash(key: str) -> int:
+        """Keyed SipHash-2-4 hash function to be used with HashMap implementation"""
+        return _siphash_2_4(k0, k1, key.encode())
+
+    hash_function_siphash.seed = seed
+    return hash_function_siphash
+
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': hash_function_fnv1a,
+    'murmur': hash_function_murmur,
+}
+
+
+def hash_function_name(function: callable) -> str:
+    """
+    Returns the name of function in HASH_FUNCTIONS, or None if it is not registered. Files that store a hash table
+    record this name so the same function can be found again when the file is read.
+    """
+    for name, registered in HASH_FUNCTIONS.items():
+        if registered is function:
+            return name
+    return None
+
+
+def distribution_report(function: callable, keys: list, capacity: int) -> dict:
+    """
+    Hashes every key into a table of the given capacity and measures how evenly the keys are spread and how fast
+    the function runs.
+
+    Args:
+        function: callable - hash function to measure
+        keys: list - distinct string keys to hash
+        capacity: int - number of buckets to distribute the keys over
+
+    Returns:
+        report: dict - empty_buckets, max_chain, collisions (keys sharing a bucket with an earlier key),
+                       distinct_hashes, chi_squared (0 for a perfectly uniform spread, about capacity for a random one)
+                       and keys_per_second
+    """
+    counts = [0] * capacity
+    hashes = set()
+
+    start = time.perf_counter()
+    for key in keys:
+        hash_value = function(key)
+        counts[hash_value % capacity] += 1
+        hashes.add(hash_value)
+    elapsed = time.perf_counter() - start
+
+    expected = len(keys) / capacity
+    chi_squared = sum((count - expected) ** 2 for count in counts) / expected if expected else 0.0
+    occupied = capacity - counts.count(0)
+
+    return {
+        'function': getattr(function, '__name__', str(function)),
+        'keys': len(keys),
+        'capacity': capacity,
+        'empty_buckets': capacity - occupied,
+        'max_chain': max(counts),
+        'collisions': len(keys) - occupied,
+        'distinct_hashes': len(hashes),
+        'chi_squared': round(chi_squared, 2),
+        'keys_per_second': round(len(keys) / elapsed) if elapsed else None,
+    }
+
+
+def compare_hash_functions(keys: list, capacity: int, functions: dict = None) -> list:
+    """
+    Returns a list with one distribution_report per hash function, keyed by name.
+    Defaults to every function in HASH_FUNCTIONS plus a randomly seeded SipHash.
+    """
+    if functions is None:
+        functions = dict(HASH_FUNCTIONS)
+        functions['siphash'] = make_siphash_function()
+
+    reports = []
+    for name, function in functions.items():
+        report = distribution_report(function, keys, capacity)
+        report['function'] = name
+        reports.append(report)
+
+    return reports
+
+
+def select_hash_function(keys: list, capacity: int, functions: dict = None, current: callable = None) -> callable:
+    """
+    Returns current if it spreads keys over capacity buckets about as evenly as a random function would, that is
+    with a chi squared statistic no more than three standard deviations above its expected value. Otherwise returns
+    the given hash function with the smallest chi squared statistic, the first one listed on a tie. Only the spread
+    is compared, never the measured speed, so the same keys always select the same function and a map resized twice
+    over the same keys gets the same layout.
+
+    Args:
+        keys: list - sample of distinct string keys
+        capacity: int - number of buckets to distribute the sample over
+        functions: dict - candidate hash functions by name. Defaults to HASH_FUNCTIONS
+        current: callable - hash function in use, which is also a candidate
+
+    Returns:
+        function: callable - the selected hash function
+    """
+    candidates = list((functions or HASH_FUNCTIONS).values())
+    if current is not None and current not in candidates:
+        candidates.append(current)
+
+    spread = {function: distribution_report(function, keys, capacity)['chi_squared'] for function in candidates}
+    random_limit = capacity - 1 + 3 * math.sqrt(2 * (capacity - 1))
+    if current is not None and spread[current] <= random_limit:
+        return current
+
+    return min(candidates, key=spread.get)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import itertools
+    import random
+
+    key_sets = {
+        'sequential': ['str' + str(i) for i in range(20000)],
+        'random': [''.join(random.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=12)) for _ in range(20000)],
+        'anagrams': [''.join(p) for p in itertools.permutations('abcdefgh')][:20000],
+    }
+
+    for name, keys in key_sets.items():
+        print(f"\n{name} keys ({len(keys)} keys, capacity 20011)")
+        print("-" * 96)
+        print(f"{'function':<16}{'empty':>8}{'max chain':>11}{'collisions':>12}{'distinct':>10}"
+              f"{'chi squared':>14}{'keys/sec':>14}")
+        for report in compare_hash_functions(keys, 20011):
+            print(f"{report['function']:<16}{report['empty_buckets']:>8}{report['max_chain']:>11}"
+                  f"{report['collisions']:>12}{report['distinct_hashes']:>10}{report['chi_squared']:>14}"
+                  f"{report['keys_per_second']:>14}")
+        print(f"selected: {hash_function_name(select_hash_function(keys, 20011))}")
@@ -0,0 +1,299 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements an asyncio friendly facade over any single HashMap implementation in this
+#              project (hash_map_sc, hash_map_oa, hash_map_compact, hash_map_rh).
+#
+#              Lookups and single writes stay synchronous. Bulk loading and resizing are coroutines that do their work
+#              in chunks of chunk_size entries, or buckets while a new table is allocated, and yield to the event loop
+#              between chunks, so the longest event loop stall is bounded by chunk_size rather than by the size of the
+#              map.
+#
+#              During aresize_table the old map stays untouched and answers lookups for every key not written since
+#              the resize began. Keys written or removed during the resize live only in the new map. When all
+#              remaining entries have been copied, the new map replaces the old one.
+#
+#              It includes the following public methods:
+#
+#              get_size(), get_capacity(), table_load() - As on the wrapped HashMap
+#              put(key, value), get(key), contains_key(key), remove(key) - Synchronous, as on the wrapped HashMap
+#              get_keys_and_values() - Returns a dynamic array of each key/value pair stored in the hash map
+#              aput_many(pairs, chunk_size) - Coroutine adding pairs from an iterable or async iterable in chunks,
+#                                             growing the table with aresize_table before a chunk would resize it
+#              aresize_table(new_capacity, chunk_size) - Coroutine resizing the table in chunks
+#              is_resizing() - Returns True while aresize_table is running
+
+import asyncio
+
+from a6_include import DynamicArray
+from hash_map_sc import HashMap
+
+
+class AsyncHashMap:
+    # Default number of entries handled between two yields to the event loop
+    CHUNK_SIZE = 1000
+
+    def __init__(self, hash_map=None) -> None:
+        """
+        Initialize new facade over hash_map, or over a new separate chaining HashMap if none is given.
+        """
+        self._map = hash_map if hash_map is not None else HashMap()
+
+        # Set while aresize_table is copying entries into a new map
+        self._new_map = None
+        self._written = None
+        self._written_in_old = 0
+        self._written_in_new = 0
+        self._resize_lock = asyncio.Lock()
+
+    def is_resizing(self) -> bool:
+        """
+        Returns True while aresize_table is running
+        """
+        return self._new_map is not None
+
+    def _map_for(self, key: str):
+        """
+        Returns the map that holds the current state of key
+        """
+        if self._new_map is not None and key in self._written:
+            return self._new_map
+        return self._map
+
+    def _before_write(self, key: str) -> bool:
+        """
+        Marks key as written during a resize and returns whether it was counted as present in the new map
+        """
+        if key not in self._written:
+            self._written.add(key)
+            if self._map.contains_key(key):
+                self._written_in_old += 1
+            return False
+        return self._new_map.contains_key(key)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        if self._new_map is None:
+            return self._map.get_size()
+        return self._map.get_size() - self._written_in_old + self._written_in_new
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, which is the capacity of the new map while a resize is running
+        """
+        return (self._new_map or self._map).get_capacity()
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor
+        """
+        return self.get_size() / self.get_capacity()
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map
+        """
+        if self._new_map is None:
+            self._map.put(key, value)
+            return
+
+        was_present = self._before_write(key)
+        self._new_map.put(key, value)
+        if not was_present:
+            self._written_in_new += 1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+        if self._new_map is None:
+            self._map.remove(key)
+            return
+
+        was_present = self._before_write(key)
+        if not was_present and self._new_map.contains_key(key):
+            # A copy made by the resize before the key was first written
+            was_present = True
+            self._written_in_new += 1
+        self._new_map.remove(key)
+        if was_present:
+            self._written_in_new -= 1
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key if the key exists in the hash map, otherwise None
+        """
+        return self._map_for(key).get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False
+        """
+        return self._map_for(key).contains_key(key)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of each key/value pair stored in the hash map.
+        """
+        if self._new_map is None:
+            return self._map.get_keys_and_values()
+
+        da = DynamicArray()
+        for key, value, _ in self._map._entries():
+            if key not in self._written:
+                da.append((key, value))
+        for key, value, _ in self._new_map._entries():
+            if key in self._written:
+                da.append((key, value))
+        return da
+
+    async def aresize_table(self, new_capacity: int, chunk_size: int = None) -> None:
+        """
+        Changes the capacity of the hash map, copying chunk_size entries at a time into a new map and yielding to the
+        event loop between chunks. The empty new map is also allocated chunk_size buckets at a time, where its class
+        creates an object per bucket. The new map has the class, hash function and opt-in settings of the old one, and
+        entries are copied with their cached hashes, so no key is rehashed unless the new map replaces its hash function
+        while the entries are copied.
+
+        Args:
+            new_capacity: int - the proposed capacity. The wrapped map's rules for prime capacities apply.
+            chunk_size: int - number of entries copied between two yields, defaults to CHUNK_SIZE
+
+        Returns:
+            None - once the new map has replaced the old one
+        """
+        if new_capacity < 1:
+            return
+
+        chunk_size = chunk_size or self.CHUNK_SIZE
+
+        async with self._resize_lock:
+            # Writes made while the new map is allocated go to the old map, and are copied with its other entries
+            for new_map in self._map._empty_copy_steps(new_capacity, chunk_size):
+                await asyncio.sleep(0)
+
+            self._new_map = new_map
+            function = self._map._hash_function
+            self._written = set()
+            self._written_in_old = 0
+            self._written_in_new = 0
+
+            copied = 0
+            for key, value, hash_value in self._map._entries():
+
+                # Keys written since the resize began already have their current state in the new map
+                if key not in self._written:
+                    new_map = self._new_map
+                    if new_map._hash_function is not function:
+                        hash_value = new_map._hash_function(key)
+                    new_map._put_hashed(key, value, hash_value)
+
+                copied += 1
+                if copied % chunk_size == 0:
+                    await asyncio.sleep(0)
+
+            # Statistics enabled on the old map carry over to the new one
+            self._new_map._stats = self._map._stats
+
+            self._map = self._new_map
+            self._new_map = None
+            self._written = None
+
+    async def aput_many(self, pairs, chunk_size: int = None) -> None:
+        """
+        Updates or adds every key/value pair in pairs, chunk_size pairs at a time, yielding to the event loop between
+        chunks. Before a chunk that would make the map resize itself, the map is grown with aresize_table instead.
+
+        Args:
+            pairs: iterable, async iterable or dynamic array of (key, value) tuples
+            chunk_size: int - number of pairs added between two yields, defaults to CHUNK_SIZE
+        """
+        chunk_size = chunk_size or self.CHUNK_SIZE
+
+        if isinstance(pairs, DynamicArray):
+            da = pairs
+            pairs = (da[index] for index in range(da.length()))
+
+        chunk = []
+        if hasattr(pairs, '__aiter__'):
+            async for pair in pairs:
+                chunk.append(pair)
+                if len(chunk) >= chunk_size:
+                    await self._put_chunk(chunk)
+                    chunk = []
+        else:
+            for pair in pairs:
+                chunk.append(pair)
+                if len(chunk) >= chunk_size:
+                    await self._put_chunk(chunk)
+                    chunk = []
+
+        if chunk:
+            await self._put_chunk(chunk)
+
+    async def _put_chunk(self, chunk: list) -> None:
+        """
+        Puts one chunk of pairs, growing the map cooperatively first if the chunk would trigger a resize
+        """
+        async with self._resize_lock:
+            capacity = self._map._capacity_for(len(chunk))
+
+        if capacity:
+            await self.aresize_table(capacity)
+
+        put = self.put
+        for key, value in chunk:
+            put(key, value)
+        await asyncio.sleep(0)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import time
+
+    from hash_functions import hash_function_fnv1a
+    from hash_map_oa import HashMap as OpenAddressingHashMap
+
+    async def ticker(stalls: list, stop: asyncio.Event) -> None:
+        """Measures the longest gap between event loop iterations"""
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            stalls.append(now - last)
+            last = now
+
+    async def main() -> None:
+        for hash_map in (HashMap(11, hash_function_fnv1a), OpenAddressingHashMap(11, hash_function_fnv1a)):
+            m = AsyncHashMap(hash_map)
+            stalls, stop = [], asyncio.Event()
+            task = asyncio.create_task(ticker(stalls, stop))
+
+            await m.aput_many((('str' + str(i), i) for i in range(20000)), chunk_size=500)
+            resize = asyncio.create_task(m.aresize_table(m.get_capacity() * 2, chunk_size=500))
+            await asyncio.sleep(0)
+            m.put('during resize', 1)
+            m.remove('str0')
+            await resize
+
+            stop.set()
+            await task
+            print(type(hash_map).__module__, m.get_size(), m.get_capacity(), m.get('during resize'), m.get('str0'),
+                  m.get('str19999'), f"longest stall {max(stalls) * 1000:.1f} ms")
+
+        # Growing to a large capacity allocates the empty buckets in chunks too
+        m = AsyncHashMap(HashMap(11, hash_function_fnv1a))
+        m.put('str0', 0)
+        stalls, stop = [], asyncio.Event()
+        task = asyncio.create_task(ticker(stalls, stop))
+        await m.aresize_table(2000000, chunk_size=500)
+        stop.set()
+        await task
+        print("large resize", m.get_size(), m.get_capacity(), m.get('str0'), f"longest stall {max(stalls) * 1000:.1f} ms")
+
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Bloom filter placed in front of the lookups of a HashMap. See enable_bloom_filter() on the maps.
+#
+#              The filter stores the hash of every key put into the map, so a key whose hash was never put is
+#              reported as missing without reading any bucket. A key that only shares bits with other keys passes
+#              the filter and is then looked up in the table: a false positive. Keys cannot be taken out of a Bloom
+#              filter, so the map builds a new one each time its table is rebuilt (resize_table, compact and clear),
+#              which also drops the bits of removed keys. A map that migrates its keys over many operations instead
+#              fills a grown() filter as keys move, and the previous filter answers for the keys not moved yet.
+#
+#              The bit positions of a hash come from double hashing of its murmur3 finalized value, so hash functions
+#              with poorly mixed low bits still use the whole filter. Keys with equal hashes cannot be told apart,
+#              though, so with a hash function that gives many keys the same hash (hash_function_1 or hash_function_2
+#              on similar keys) most missing keys pass the filter.
+
+import math
+
+from hash_functions import _finalize
+
+# Hashes are filtered as unsigned 64-bit integers
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class BloomFilter:
+    """
+    Bit array answering "possibly added" or "certainly not added" for 64-bit hashes, with counters of the answers
+    """
+
+    def __init__(self, expected_keys: int, bits_per_key: int = 10) -> None:
+        """
+        Initialize an empty filter sized for expected_keys hashes. With the default 10 bits per key, about 1% of the
+        hashes never added pass the filter once expected_keys hashes have been added.
+        """
+        self._bits_per_key = bits_per_key
+        self._size = max(64, expected_keys * bits_per_key)
+        self._hashes = max(1, round(bits_per_key * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self._queries = 0
+        self._rejected = 0
+        self._false_positives = 0
+
+        # Filter of the table being migrated from, consulted until drop_previous() is called
+        self._previous = None
+
+    def cleared(self, expected_keys: int) -> "BloomFilter":
+        """Return an empty filter with the same bits per key sized for expected_keys, keeping the recorded answers."""
+        bloom = BloomFilter(expected_keys, self._bits_per_key)
+        bloom._queries, bloom._rejected, bloom._false_positives = self._queries, self._rejected, self._false_positives
+        return bloom
+
+    def grown(self, expected_keys: int) -> "BloomFilter":
+        """
+        Return an empty filter sized for expected_keys that keeps the recorded answers and passes every hash this
+        filter passes, until its drop_previous() is called.
+        """
+        bloom = self.cleared(expected_keys)
+        self.drop_previous()
+        bloom._previous = self
+        return bloom
+
+    def drop_previous(self) -> None:
+        """Stop consulting the filter this one was grown from, once every key has been added to this one."""
+        self._previous = None
+
+    def _start(self, hash_value: int) -> tuple:
+        """Return the first bit position of hash_value and the step between its positions."""
+        mixed = _finalize(hash_value & _HASH_MASK)
+        return mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+
+    def add(self, hash_value: int) -> None:
+        """Set the bits of hash_value."""
+        bits, size = self._bits, self._size
+        position, step = self._start(hash_value)
+        for _ in range(self._hashes):
+            index = position % size
+            bits[index >> 3] |= 1 << (index & 7)
+            position += step
+
+    def _holds(self, hash_value: int) -> bool:
+        """Return True if every bit of hash_value is set."""
+        bits, size = self._bits, self._size
+        position, step = self._start(hash_value)
+        for _ in range(self._hashes):
+            index = position % size
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            position += step
+        return True
+
+    def might_contain(self, hash_value: int) -> bool:
+        """Return False if hash_value was certainly never added, and True if it may have been."""
+        self._queries += 1
+        if self._holds(hash_value) or (self._previous is not None and self._previous._holds(hash_value)):
+            return True
+
+        self._rejected += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """Record that a hash which passed might_contain belonged to no key in the map."""
+        self._false_positives += 1
+
+    def report(self) -> dict:
+        """
+        Returns the size of the filter and its recorded answers.
+
+        Returns:
+            report: dict - bits, hashes (bit positions per key), queries, rejected (queries answered without reading
+                           the table), false_positives, false_positive_rate (share of missing keys that passed the
+                           filter) and expected_false_positive_rate (from the share of bits set)
+        """
+        misses = self._rejected + self._false_positives
+        set_bits = int.from_bytes(self._bits, 'little').bit_count()
+
+        return {
+            'bits': self._size,
+            'hashes': self._hashes,
+            'queries': self._queries,
+            'rejected': self._rejected,
+            'false_positives': self._false_positives,
+            'false_positive_rate': self._false_positives / misses if misses else 0.0,
+            'expected_false_positive_rate': (set_bits / self._size) ** self._hashes,
+        }
@@ -0,0 +1,447 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements a compact Hash Map using open addressing with quadratic probing for collision
+#              resolution. Instead of one HashEntry object per bucket, the table is stored in parallel flat arrays of
+#              hashes, keys, values and bucket states, so an entry costs a few machine words and put never allocates
+#              an entry object.
+#
+#              CompactHashMap has the same public methods, probing scheme, resize rules and iterator as
+#              hash_map_oa.HashMap. Iterating yields HashEntry objects built on demand.
+
+import time
+from array import array
+
+from a6_include import DynamicArray, HashEntry, HashMapIterator, hash_function_1, hash_function_2
+from hash_functions import hash_function_fnv1a
+from hash_map_oa import _EMPTY, _LIVE, _TOMBSTONE, HashMap
+from hash_map_primes import is_prime, next_prime
+from hash_map_snapshot import read_snapshot, write_snapshot
+
+# Hashes are stored as unsigned 64-bit integers
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class CompactHashMap(HashMap):
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new compact HashMap that uses
+        quadratic probing for collision resolution
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._init_state()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._entry_at(i)) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the parallel arrays with empty arrays of the given capacity
+        """
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+
+    def _entry_at(self, index: int) -> HashEntry:
+        """
+        Returns a HashEntry describing the bucket at index, or None if the bucket is empty
+        """
+        if self._states[index] == _EMPTY:
+            return None
+
+        entry = HashEntry(self._keys[index], self._values[index], self._hashes[index])
+        entry.is_tombstone = self._states[index] == _TOMBSTONE
+        return entry
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the hash of key as stored in the table, an unsigned 64-bit integer
+        """
+        return self._hash_function(key) & _HASH_MASK
+
+    def _home(self, hash_value: int) -> int:
+        """
+        Returns the first bucket of the probe sequence of hash_value
+        """
+        return hash_value % self._capacity
+
+    def _next(self, index_initial: int, probe: int) -> int:
+        """
+        Returns the bucket visited after probe buckets of the probe sequence starting at index_initial
+        """
+        # Determine next index using quadratic probing scheme
+        return (index_initial + probe * probe) % self._capacity
+
+    def _find(self, key: str, hash_value: int, operation: str) -> int:
+        """
+        Returns the index of the live bucket holding key, or -1 if the key does not exist in the hash map.
+        operation names the calling method in the recorded statistics.
+        """
+        hashes, keys, states = self._hashes, self._keys, self._states
+        index_initial = self._home(hash_value)
+        index = index_initial
+        probe = 1
+
+        # Probe until an empty bucket ends the sequence, or the whole table has been probed
+        while states[index] != _EMPTY and probe <= self._capacity:
+            if hashes[index] == hash_value and states[index] == _LIVE and keys[index] == key:
+                if self._stats is not None:
+                    self._stats.record(operation, probe)
+                return index
+
+            index = self._next(index_initial, probe)
+            probe += 1
+
+        if self._stats is not None:
+            self._stats.record(operation, probe)
+        return -1
+
+    # ------------------------------------------------------------------ #
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Updates the key/value pair in the hash map using an already computed hash of the key. An existing key has its
+        value replaced in place, so overwrites allocate nothing.
+        """
+        hash_value = self._before_put(key, hash_value & _HASH_MASK)
+
+        index, found, probe = self._probe(key, hash_value)
+        if found:
+            self._values[index] = value
+            if self._stats is not None:
+                self._stats.record('put', probe)
+            return
+
+        self._store(index, key, value, hash_value, probe, 'put')
+
+    def _probe(self, key: str, hash_value: int) -> tuple:
+        """
+        Walks the probe sequence of key up to the first empty bucket.
+
+        Returns:
+            result: tuple - (index, found, probe). If found is True, index is the live bucket holding key. Otherwise
+                            it is the bucket a new entry for key goes in: the first tombstone passed, or else the
+                            empty bucket ending the sequence. probe is the number of buckets visited.
+        """
+        hashes, keys, states = self._hashes, self._keys, self._states
+        index_initial = self._home(hash_value)
+        index = index_initial
+        probe = 1
+        first_tombstone = -1
+
+        # _before_put leaves an empty bucket on every probe sequence, so the walk ends within capacity probes
+        while states[index] != _EMPTY and probe <= self._capacity:
+            if hashes[index] == hash_value and states[index] == _LIVE and keys[index] == key:
+                return index, True, probe
+
+            # Remember the first tombstone on the probe path so a new key can reuse it
+            if first_tombstone < 0 and states[index] == _TOMBSTONE:
+                first_tombstone = index
+
+            index = self._next(index_initial, probe)
+            probe += 1
+
+        if first_tombstone >= 0:
+            return first_tombstone, False, probe
+        if states[index] != _EMPTY:
+            raise RuntimeError("no open bucket on the probe sequence of the key")
+        return index, False, probe
+
+    def _store(self, index: int, key: str, value: object, hash_value: int, probe: int, operation: str) -> None:
+        """
+        Stores the entry of a key that is not in the hash map at the bucket _probe returned for it.
+        probe is the number of buckets _probe visited, and operation names the calling method in the recorded
+        statistics.
+        """
+        # The bucket is either empty or holds a tombstone that the new entry replaces
+        if self._states[index] == _TOMBSTONE:
+            self._tombstones -= 1
+
+        self._hashes[index] = hash_value
+        self._keys[index] = key
+        self._values[index] = value
+        self._states[index] = _LIVE
+        self._size += 1
+        self._modifications += 1
+
+        if self._stats is not None:
+            self._stats.record(operation, probe)
+            self._stats.record_insert(probe > 1)
+
+        # Rehash with a seeded hash function if the probe sequence is abnormally long
+        if self._flood_limit and probe > self._flood_limit:
+            self._reseed()
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Returns the capacity resize_table uses for a proposed capacity. It must be a prime number, so a capacity
+        that is not prime is changed to the next prime number.
+        """
+        if not is_prime(capacity):
+            capacity = next_prime(capacity)
+        return capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the underlying arrays. All existing key/value pairs are put into the new arrays using
+        their stored hashes. The new capacity should be a prime number. If it is not prime, the capacity will be
+        changed to the next prime number.
+        """
+        # new_capacity must be greater than the current number of elements
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._round_capacity(new_capacity)
+
+        # In adaptive mode, rehash every key if another hash function suits the current keys better
+        if self._adaptive_sample:
+            function = self._select_hash_function(new_capacity)
+            if function is not self._hash_function:
+                self._rehash_with(function, new_capacity)
+                return
+
+        # Puts made while rehashing are part of the resize, so they are not recorded as operations and cannot
+        # trigger a rehash with another hash function
+        stats, self._stats = self._stats, None
+        flood_limit, self._flood_limit = self._flood_limit, 0
+        adaptive_sample, self._adaptive_sample = self._adaptive_sample, 0
+        start = time.perf_counter()
+
+        # Keep the old arrays, then allocate new ones and put each live entry back using its stored hash
+        hashes, keys, values, states = self._hashes, self._keys, self._values, self._states
+        self._capacity = new_capacity
+        self.clear()
+
+        for index in range(len(states)):
+            if states[index] == _LIVE:
+                self._put_hashed(keys[index], values[index], hashes[index])
+
+        self._stats = stats
+        self._flood_limit = flood_limit
+        self._adaptive_sample = adaptive_sample
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
+
+    def _upsert_hashed(self, key: str, fn: callable, default: object, hash_value: int) -> object:
+        """
+        Implements upsert using an already computed hash of the key. The probe sequence is walked once: an existing
+        value is replaced in place, and a new key is stored in the bucket the walk found for it.
+        """
+        hash_value = self._before_put(key, hash_value & _HASH_MASK)
+
+        index, found, probe = self._probe(key, hash_value)
+        if found:
+            value = self._values[index] = fn(self._values[index])
+            if self._stats is not None:
+                self._stats.record('upsert', probe)
+            return value
+
+        value = fn(default)
+        self._store(index, key, value, hash_value, probe, 'upsert')
+        return value
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key if the key exists in the hash map, otherwise None.
+        """
+        hash_value = self._hash_function(key) & _HASH_MASK
+
+        # Most missing keys are rejected by the Bloom filter without probing
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return None
+
+        index = self._find(key, hash_value, 'get')
+        if index >= 0:
+            return self._values[index]
+
+        if self._bloom is not None:
+            self._bloom.record_false_positive()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        """
+        hash_value = self._hash_function(key) & _HASH_MASK
+
+        # Most missing keys are rejected by the Bloom filter without probing
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return False
+
+        if self._find(key, hash_value, 'contains_key') >= 0:
+            return True
+
+        if self._bloom is not None:
+            self._bloom.record_false_positive()
+        return False
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+        index = self._find(key, self._hash_function(key) & _HASH_MASK, 'remove')
+        if index < 0:
+            return
+
+        # Leave a tombstone and release the references held by the bucket
+        self._states[index] = _TOMBSTONE
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+        self._modifications += 1
+
+        # Shrink the table if the load factor dropped below the low-water mark. Otherwise compact the table once
+        # tombstones take up too much of it
+        capacity = self._shrink_capacity()
+        if capacity:
+            self.resize_table(capacity)
+        elif self._tombstones >= self.TOMBSTONE_THRESHOLD * self._capacity:
+            self.compact()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of each key/value pair stored in the hash map.
+        """
+        keys, values, states = self._keys, self._values, self._states
+        return DynamicArray([(keys[index], values[index]) for index in range(self._capacity)
+                             if states[index] == _LIVE])
+
+    def _entries(self):
+        """
+        Yields (key, value, hash_value) for every key/value pair stored in the hash map, one bucket at a time.
+        """
+        for index in range(self._capacity):
+            if self._states[index] == _LIVE:
+                yield self._keys[index], self._values[index], self._hashes[index]
+
+    def _empty_copy_steps(self, capacity: int, chunk_size: int):
+        """
+        Generator yielding the same map as _empty_copy(capacity) in a single step, since its flat arrays are allocated
+        without creating an object per bucket
+        """
+        yield self._empty_copy(capacity)
+
+    def snapshot(self, path: str) -> None:
+        """
+        Writes the hash map to a binary file. The bucket states are written as they are stored. See HashMap.snapshot.
+        """
+        occupied = [index for index in range(self._capacity) if self._states[index] != _EMPTY]
+        write_snapshot(path, self._SNAPSHOT_KIND, self._capacity, self._hash_function, self._states,
+                       array('Q', [self._hashes[index] for index in occupied]),
+                       [self._keys[index] for index in occupied],
+                       [self._values[index] for index in occupied])
+
+    @classmethod
+    def restore(cls, path: str) -> "CompactHashMap":
+        """
+        Returns a new hash map with the exact bucket layout stored by snapshot(), without hashing any key.
+        See HashMap.restore.
+        """
+        capacity, function, states, hashes, keys, values = read_snapshot(path, cls._SNAPSHOT_KIND)
+        hash_map = cls(capacity, function)
+        hash_map._states = bytearray(states)
+
+        occupied = [index for index in range(capacity) if states[index] != _EMPTY]
+        for position, index in enumerate(occupied):
+            hash_map._hashes[index] = hashes[position]
+            hash_map._keys[index] = keys[position]
+            hash_map._values[index] = values[position]
+
+        hash_map._size = states.count(_LIVE)
+        hash_map._tombstones = states.count(_TOMBSTONE)
+        return hash_map
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
+
+        # Keys are put back by resize_table and compact, which rebuild the Bloom filter for the new capacity
+        if self._bloom is not None:
+            self._bloom = self._bloom.cleared(self._capacity // 2)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Create an independent iterator over the live entries of the table, yielding a HashEntry built for each
+        """
+        states = self._states
+        return HashMapIterator(self, (self._entry_at(index) for index in range(self._capacity)
+                                      if states[index] == _LIVE))
+
+
+def bytes_per_entry(map_class, count: int) -> float:
+    """
+    Returns the number of bytes allocated per key/value pair when count integer values are put into a new map of the
+    given class, measured with tracemalloc. The keys themselves are allocated before measuring starts.
+    """
+    import tracemalloc
+
+    keys = ['str' + str(i) for i in range(count)]
+
+    tracemalloc.start()
+    m = map_class(11, hash_function_fnv1a)
+    for i in range(count):
+        m.put(keys[i], i)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return allocated / count
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove example")
+    print("--------------------------")
+    m = CompactHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    m.put('str0', 'overwritten')
+    m.remove('str1')
+    print(m.get('str0'), m.get('str1'), m.contains_key('str2'), m.get_size(), m.stats()['tombstones'])
+
+    print("\nmissing key on a full collision chain example")
+    print("---------------------------------------------")
+    # Anagrams have equal hashes under hash_function_1, so they all probe the same buckets from the same home. The
+    # table grows before they fill every bucket quadratic probing reaches, so a missing anagram is still found absent
+    words = ['abcdefg', 'abcdegf', 'abcdfeg', 'abcdfge', 'abcdgef', 'abcdgfe', 'abcedfg', 'abcedgf']
+    m = CompactHashMap(11, hash_function_1)
+    for word in words[:-1]:
+        m.put(word, word)
+    m.remove(words[-1])
+    print(m.get_size(), m.get_capacity(), m.get(words[-1]), m.contains_key(words[-1]), m.get(words[0]))
+
+    print("\n__iter__(), __next__() example")
+    print("------------------------------")
+    m = CompactHashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nmemory example")
+    print("--------------")
+    for map_class in (HashMap, CompactHashMap):
+        print(f"{map_class.__module__}.{map_class.__name__}: {bytes_per_entry(map_class, 50000):.1f} bytes per entry")
@@ -0,0 +1,220 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements a thread-safe Hash Map that spreads its keys over several independent HashMap
+#              shards, each guarded by its own lock (lock striping).
+#
+#              A key always lives in the shard chosen by Python's built-in hash of the key, so threads working on keys
+#              in different shards never wait for each other, and a resize only locks the shard being resized.
+#
+#              It includes the following public methods:
+#
+#              get_size() - Returns the number of elements in the hash map
+#              get_capacity() - Returns the combined capacity of all shards
+#              put(key, value) - Updates the key/value pair in the hash map
+#              put_many(pairs) - Updates or adds many key/value pairs, locking each shard once
+#              resize_table(new_capacity) - Resizes every shard to an equal part of new_capacity, one shard at a time
+#              table_load() - Returns the load factor of the hash map
+#              empty_buckets() - Returns the number of empty buckets in the hash map
+#              get(key) - Returns the value associated with the given key if the key exists in the hash map
+#              contains_key(key) - Returns True if the given key exists in the hash map. False, if not.
+#              remove(key) - Removes the value associated with the given key from the hash map
+#              upsert(key, fn, default), setdefault(key, default), increment(key, delta) - As on the shards, made atomic
+#                                                                                      by the shard's lock
+#              get_keys_and_values() - Returns a dynamic array where each index contains a tuple of each key/value pair
+#                                      stored in the hash map. Each shard is read under its own lock.
+#              clear() - Clears the contents of the hash map. It does not change the underlying hash table capacity
+
+import threading
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+
+
+class ConcurrentHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 shard_count: int = 16,
+                 map_class: type = HashMap) -> None:
+        """
+        Initialize new thread-safe HashMap made of shard_count shards of map_class, each created with an equal part
+        of capacity and the given hash function. map_class may be any HashMap implementation in this project.
+        """
+        self._shard_count = max(1, shard_count)
+        shard_capacity = max(1, capacity // self._shard_count)
+
+        self._shards = [map_class(shard_capacity, function) for _ in range(self._shard_count)]
+        self._locks = [threading.Lock() for _ in range(self._shard_count)]
+
+    def _shard_index(self, key: str) -> int:
+        """
+        Returns the index of the shard that holds key
+        """
+        return hash(key) % self._shard_count
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        size = 0
+        for index in range(self._shard_count):
+            with self._locks[index]:
+                size += self._shards[index].get_size()
+        return size
+
+    def get_capacity(self) -> int:
+        """
+        Return combined capacity of all shards
+        """
+        capacity = 0
+        for index in range(self._shard_count):
+            with self._locks[index]:
+                capacity += self._shards[index].get_capacity()
+        return capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map, locking only the shard that holds key
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            self._shards[index].put(key, value)
+
+    def put_many(self, pairs) -> None:
+        """
+        Updates or adds every key/value pair in pairs. Pairs are grouped by shard first, so each shard is locked and
+        resized at most once.
+        """
+        if isinstance(pairs, DynamicArray):
+            pairs = [pairs[index] for index in range(pairs.length())]
+
+        groups = [[] for _ in range(self._shard_count)]
+        for pair in pairs:
+            groups[self._shard_index(pair[0])].append(pair)
+
+        for index in range(self._shard_count):
+            if groups[index]:
+                with self._locks[index]:
+                    self._shards[index].put_many(groups[index])
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes each shard to an equal part of new_capacity. Only one shard is locked at a time, so the rest of the
+        map stays available while a shard is being rehashed.
+        """
+        shard_capacity = max(1, new_capacity // self._shard_count)
+        for index in range(self._shard_count):
+            with self._locks[index]:
+                self._shards[index].resize_table(shard_capacity)
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table
+        """
+        counter = 0
+        for index in range(self._shard_count):
+            with self._locks[index]:
+                counter += self._shards[index].empty_buckets()
+        return counter
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key if the key exists in the hash map, otherwise None
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self._shards[index].get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self._shards[index].contains_key(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            self._shards[index].remove(key)
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Replaces the value of key with fn(value), or adds key with fn(default), while holding the shard's lock
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self._shards[index].upsert(key, fn, default)
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value of key, adding key with default first if it is missing, while holding the shard's lock
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self._shards[index].setdefault(key, default)
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value of key, treating a missing key as 0, while holding the shard's lock
+        """
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self._shards[index].increment(key, delta)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of each key/value pair stored in the hash map.
+        Each shard is copied under its own lock, so the result is consistent per shard, not across shards.
+        """
+        da = DynamicArray()
+        for index in range(self._shard_count):
+            with self._locks[index]:
+                shard_pairs = self._shards[index].get_keys_and_values()
+            for position in range(shard_pairs.length()):
+                da.append(shard_pairs[position])
+        return da
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        for index in range(self._shard_count):
+            with self._locks[index]:
+                self._shards[index].clear()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\nconcurrent put / get example")
+    print("----------------------------")
+    m = ConcurrentHashMap(53, hash_function_2, shard_count=8)
+
+    def worker(thread: int) -> bool:
+        for i in range(thread * 1000, (thread + 1) * 1000):
+            m.put('str' + str(i), i)
+        return all(m.get('str' + str(i)) == i for i in range(thread * 1000, (thread + 1) * 1000))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        print(all(executor.map(worker, range(8))))
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+
+    m.remove('str0')
+    print(m.contains_key('str0'), m.contains_key('str1'), m.get_size())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
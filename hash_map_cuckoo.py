@@ -0,0 +1,615 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements a Hash Map using cuckoo hashing for collision resolution, so that every lookup
+#              checks a fixed number of slots however the keys collide.
+#
+#              The slots are split into two tables of equal prime size. A key may only be stored in one slot of each
+#              table: its hash modulo the table size in the first table, and its hash mixed by the murmur3 finalizer
+#              in the second. A new key that finds both slots taken evicts the key in its first slot, which moves to
+#              its slot in the other table, possibly evicting another key in turn. If a chain of evictions is longer
+#              than MAX_KICKS, the key left without a slot goes to a stash of at most STASH_SIZE entries. When the
+#              stash is full too, the table is rebuilt at twice its capacity.
+#
+#              get, contains_key and remove therefore check at most 2 + STASH_SIZE slots. Keys with equal full hashes
+#              (for example anagrams under hash_function_1) always share both slots, so if more of them arrive than
+#              the slots and the stash can hold, the hash function is replaced by a randomly seeded SipHash function,
+#              as with the flood protection of the other maps.
+#
+#              CuckooHashMap(capacity, function) supports the following public methods:
+#
+#              get_size() - Returns the number of elements in the hash map
+#              get_capacity() - Returns the number of slots in both tables
+#              put(key, value) - Updates the key/value pair in the hash map
+#              resize_table(new_capacity) - Changes the capacity of the tables and places existing key/value pairs again
+#              table_load() - Returns the load factor of the hash map
+#              empty_buckets() - Returns the number of empty slots in both tables
+#              get(key) - Returns the value associated with the given key if the key exists in the hash map
+#              contains_key(key) - Returns True if the given key exists in the hash map. False, if not.
+#              remove(key) - Removes the value associated with the given key from the hash map
+#              upsert(key, fn, default) - Replaces the value of key with fn(value), or adds key with fn(default)
+#              setdefault(key, default) - Returns the value of key, adding key with default first if it is missing
+#              increment(key, delta) - Adds delta to the value of key, treating a missing key as 0
+#              put_many(pairs, size_hint) - Updates or adds many key/value pairs, resizing the tables at most once
+#              get_many(keys) - Returns a dynamic array with the value associated with each of the given keys
+#              remove_many(keys) - Removes each of the given keys from the hash map
+#              enable_stats() / disable_stats() - Starts or stops recording slots checked, resizes and collisions
+#              stats() - Returns a dictionary with the number of live and empty slots, the stash size, the number
+#                        of hash function replacements and, if enabled, the recorded statistics
+#              snapshot(path) - Writes the slot layout, the stash and every entry to a binary file
+#              restore(path) - Class method returning a CuckooHashMap rebuilt from a snapshot without hashing any key
+#              get_keys_and_values() - Returns a dynamic array where each index contains a tuple of each key/value pair
+#                                      stored in the hash map.
+#              keys(), values(), items() - Return independent iterators over the keys, values or (key, value) tuples
+#                                          of the hash map. They raise RuntimeError if the map gains or loses keys
+#                                          during iteration.
+#              clear() - Clears the contents of the hash map. It does not change the underlying hash table capacity
+
+import time
+from array import array
+from collections import Counter
+
+from a6_include import DynamicArray, HashEntry, HashMapIterator, hash_function_1, hash_function_2
+from hash_functions import _finalize, make_siphash_function
+from hash_map_methods import MapMethods
+from hash_map_primes import next_prime
+from hash_map_snapshot import read_snapshot, write_snapshot
+from hash_map_stats import MapStats
+
+# Hashes are stored as unsigned 64-bit integers
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class CuckooHashMap(MapMethods):
+    # Longest chain of evictions made by a put before the key left without a slot is stashed
+    MAX_KICKS = 64
+
+    # Most entries held outside the two tables
+    STASH_SIZE = 4
+
+    # Load factor at which put doubles the capacity. Two tables of one slot per key fill up shortly after half load
+    MAX_LOAD = 0.45
+
+    # Layout kind written to snapshots
+    _SNAPSHOT_KIND = 'cuckoo'
+
+    # Settings given to the empty copies made by _empty_copy()
+    _COPIED_STATE = ('_reseeds',)
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new cuckoo HashMap with two tables that share the given capacity
+        """
+        self._hash_function = function
+        self._allocate(self._round_capacity(capacity))
+        self._size = 0
+
+        # Number of times keys were added or removed or the table was rebuilt. Iterators compare it to detect changes
+        self._modifications = 0
+
+        # Number of times the hash function was replaced because too many keys had equal hashes
+        self._reseeds = 0
+
+        # MapStats collecting operation statistics, or None while statistics are disabled. See enable_stats()
+        self._stats = None
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._entry_at(i)) + '\n'
+        for entry in self._stash:
+            out += 'stash: ' + str(entry) + '\n'
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Returns the capacity resize_table uses for a proposed capacity. Both tables must have the same prime size, so
+        the capacity is changed to twice the prime number at or above half of it.
+        """
+        return 2 * next_prime((capacity + 1) // 2)
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the tables and the stash with empty ones of the given capacity
+        """
+        self._capacity = capacity
+        self._table_size = capacity // 2
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._live = bytearray(capacity)
+        self._stash = []
+
+    def _entry_at(self, index: int) -> HashEntry:
+        """
+        Returns a HashEntry describing the slot at index, or None if the slot is empty
+        """
+        if not self._live[index]:
+            return None
+        return HashEntry(self._keys[index], self._values[index], self._hashes[index])
+
+    def _slots(self, hash_value: int) -> tuple:
+        """
+        Returns the index of the slot for hash_value in the first table and in the second table
+        """
+        return hash_value % self._table_size, self._table_size + _finalize(hash_value) % self._table_size
+
+    def _locate(self, key: str, hash_value: int, operation: str) -> tuple:
+        """
+        Returns (index, None) if key is in the slot at index, (-1, entry) if key is in the stash entry, or (-1, None)
+        if the key does not exist in the hash map. operation names the calling method in the recorded statistics,
+        which count the slots and stash entries checked.
+        """
+        probes = 0
+        for index in self._slots(hash_value):
+            probes += 1
+            if self._live[index] and self._hashes[index] == hash_value and self._keys[index] == key:
+                if self._stats is not None:
+                    self._stats.record(operation, probes)
+                return index, None
+
+        found = None
+        for entry in self._stash:
+            probes += 1
+            if entry.hash_value == hash_value and entry.key == key:
+                found = entry
+                break
+
+        if self._stats is not None:
+            self._stats.record(operation, probes)
+        return -1, found
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, counting the slots of both tables
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the key already exists, its value is replaced. A new key is
+        placed by evicting keys between the two tables, and the tables are doubled beforehand if the load factor
+        would exceed MAX_LOAD.
+        """
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Updates the key/value pair in the hash map using an already computed hash of the key
+        """
+        hash_value &= _HASH_MASK
+
+        index, entry = self._locate(key, hash_value, 'put')
+        if index >= 0:
+            self._values[index] = value
+        elif entry is not None:
+            entry.value = value
+        else:
+            self._add(key, value, hash_value)
+
+    def _add(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Adds a key that is not in the hash map, doubling the tables first if the load factor would exceed MAX_LOAD
+        """
+        function = self._hash_function
+        if (self._size + 1) / self._capacity > self.MAX_LOAD:
+            self.resize_table(2 * self._capacity)
+
+        # The resize may have replaced the hash function, in which case the key is hashed again
+        if self._hash_function is not function:
+            hash_value = self._hash_function(key) & _HASH_MASK
+
+        self._size += 1
+        self._modifications += 1
+
+        if self._stats is not None:
+            self._stats.record_insert(bool(self._live[self._slots(hash_value)[0]]))
+
+        homeless = self._place(key, value, hash_value)
+        if homeless is not None:
+            self._rebuild(self._capacity, list(self._entries()) + [homeless])
+
+    def _place(self, key: str, value: object, hash_value: int) -> tuple:
+        """
+        Stores a key that is not in the map, evicting other keys as needed. Returns None once every key has a slot
+        or a place in the stash. Otherwise returns the (key, value, hash_value) of the key left without either,
+        which may not be the key given.
+        """
+        hashes, keys, values, live = self._hashes, self._keys, self._values, self._live
+
+        # Use an empty slot in either table if there is one
+        first, second = self._slots(hash_value)
+        index = second if live[first] and not live[second] else first
+
+        for _ in range(self.MAX_KICKS):
+            if not live[index]:
+                hashes[index], keys[index], values[index] = hash_value, key, value
+                live[index] = 1
+                return None
+
+            # Take the slot and move the evicted key to its slot in the other table
+            hash_value, hashes[index] = hashes[index], hash_value
+            key, keys[index] = keys[index], key
+            value, values[index] = values[index], value
+
+            first, second = self._slots(hash_value)
+            index = second if index == first else first
+
+        if len(self._stash) < self.STASH_SIZE:
+            self._stash.append(HashEntry(key, value, hash_value))
+            return None
+
+        return key, value, hash_value
+
+    def _rebuild(self, capacity: int, entries: list) -> None:
+        """
+        Puts the given (key, value, hash_value) entries into new tables of at least the given capacity, doubling it
+        until every entry has a place. Entries with equal hashes share their two slots at any capacity, so the ones
+        beyond two per hash must all fit in the stash. If they do not, the hash function is replaced by a seeded one
+        first.
+        """
+        start = time.perf_counter()
+
+        shared = Counter(hash_value for _, _, hash_value in entries)
+        overflow = sum(count - 2 for count in shared.values() if count > 2)
+        if overflow > self.STASH_SIZE and getattr(self._hash_function, 'seed', None) is None:
+            self._hash_function = make_siphash_function()
+            self._reseeds += 1
+            entries = [(key, value, self._hash_function(key) & _HASH_MASK) for key, value, _ in entries]
+
+        while True:
+            self._allocate(capacity)
+            for key, value, hash_value in entries:
+                if self._place(key, value, hash_value) is not None:
+                    break
+            else:
+                break
+            capacity = self._round_capacity(2 * capacity)
+
+        self._modifications += 1
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the tables. All existing key/value pairs are placed again using their stored hashes.
+        The capacity is rounded to twice a prime number, and is doubled further if the keys do not fit.
+
+        Args:
+            new_capacity: int - the proposed number of slots in both tables
+        """
+        # new_capacity must be greater than the current number of elements
+        if new_capacity < self._size:
+            return
+
+        self._rebuild(self._round_capacity(new_capacity), list(self._entries()))
+
+    def table_load(self) -> float:
+        """
+        Returns the current hash table load factor, counting stashed keys
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty slots in both tables
+        """
+        return self._capacity - self._size + len(self._stash)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key if the key exists in the hash map, otherwise None.
+        At most 2 + STASH_SIZE slots are checked.
+        """
+        index, entry = self._locate(key, self._hash_function(key) & _HASH_MASK, 'get')
+        if index >= 0:
+            return self._values[index]
+        if entry is not None:
+            return entry.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        At most 2 + STASH_SIZE slots are checked.
+        """
+        index, entry = self._locate(key, self._hash_function(key) & _HASH_MASK, 'contains_key')
+        return index >= 0 or entry is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+        index, entry = self._locate(key, self._hash_function(key) & _HASH_MASK, 'remove')
+        if index >= 0:
+            self._live[index] = 0
+            self._keys[index] = None
+            self._values[index] = None
+            self._unstash()
+        elif entry is not None:
+            self._stash.remove(entry)
+        else:
+            return
+
+        self._size -= 1
+        self._modifications += 1
+
+    def _unstash(self) -> None:
+        """
+        Moves each stashed entry whose slot in either table is empty back into the tables
+        """
+        for entry in list(self._stash):
+            for index in self._slots(entry.hash_value):
+                if not self._live[index]:
+                    self._hashes[index], self._keys[index], self._values[index] = (entry.hash_value, entry.key,
+                                                                                   entry.value)
+                    self._live[index] = 1
+                    self._stash.remove(entry)
+                    break
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by fn(value), or adds the key with the value fn(default) if
+        it is not in the hash map. The key is hashed and its slots checked only once.
+
+        Args:
+            key: str - the key to update or add
+            fn: callable - called with the current value, or with default for a new key, and returns the new value
+            default: object - the value passed to fn when the key is not in the hash map
+
+        Returns:
+            value: object - the new value associated with the key
+        """
+        return self._upsert_hashed(key, fn, default, self._hash_function(key))
+
+    def _upsert_hashed(self, key: str, fn: callable, default: object, hash_value: int) -> object:
+        """
+        Implements upsert using an already computed hash of the key.
+        """
+        hash_value &= _HASH_MASK
+
+        index, entry = self._locate(key, hash_value, 'upsert')
+        if index >= 0:
+            self._values[index] = fn(self._values[index])
+            return self._values[index]
+        if entry is not None:
+            entry.value = fn(entry.value)
+            return entry.value
+
+        value = fn(default)
+        self._add(key, value, hash_value)
+        return value
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the capacity needed to add count more keys without the load factor exceeding MAX_LOAD, or 0 if the
+        current capacity is already enough.
+        """
+        if (self._size + count) / self._capacity > self.MAX_LOAD:
+            return int((self._size + count) / self.MAX_LOAD) + 1
+        return 0
+
+    def _reserve(self, count: int) -> None:
+        """
+        Resizes the tables once so that count more keys can be added without the load factor exceeding MAX_LOAD.
+        """
+        capacity = self._capacity_for(count)
+        if capacity:
+            self.resize_table(capacity)
+
+    def enable_stats(self) -> None:
+        """
+        Starts recording slots checked, resizes and collisions for every operation. See stats()
+        """
+        if self._stats is None:
+            self._stats = MapStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording operation statistics and discards those recorded so far
+        """
+        self._stats = None
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary describing how the slots of the hash table are used and, if enabled, the operations
+        made on it.
+
+        Returns:
+            stats: dict - capacity, live (entries), stashed (entries), empty (slots), load and reseeds (hash function
+                          replacements). While statistics are enabled it also contains the MapStats report, where the
+                          probes of an operation are the slots and stash entries it checked, at most 2 + STASH_SIZE,
+                          and an insert collided if the first slot of its key was taken.
+        """
+        stats = {
+            'capacity': self._capacity,
+            'live': self._size,
+            'stashed': len(self._stash),
+            'empty': self.empty_buckets(),
+            'load': self.table_load(),
+            'reseeds': self._reseeds,
+        }
+        if self._stats is not None:
+            stats.update(self._stats.report())
+        return stats
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of each key/value pair stored in the hash map.
+        """
+        return DynamicArray([(key, value) for key, value, _ in self._entries()])
+
+    def _entries(self):
+        """
+        Yields (key, value, hash_value) for every key/value pair stored in the hash map, the stash last.
+        """
+        for index in range(self._capacity):
+            if self._live[index]:
+                yield self._keys[index], self._values[index], self._hashes[index]
+        for entry in self._stash:
+            yield entry.key, entry.value, entry.hash_value
+
+    def _empty_copy(self, capacity: int) -> "CuckooHashMap":
+        """
+        Returns an empty map of the same class and hash function with the given capacity. Statistics are not copied.
+        """
+        hash_map = type(self)(capacity, self._hash_function)
+        for name in self._COPIED_STATE:
+            setattr(hash_map, name, getattr(self, name))
+        return hash_map
+
+    def _empty_copy_steps(self, capacity: int, chunk_size: int):
+        """
+        Generator yielding the same map as _empty_copy(capacity) in a single step, since its flat arrays are allocated
+        without creating an object per slot
+        """
+        yield self._empty_copy(capacity)
+
+    def keys(self) -> HashMapIterator:
+        """
+        Returns an iterator over the keys of the hash map that reads the tables as it goes, without copying them
+        """
+        return HashMapIterator(self, (key for key, _, _ in self._entries()))
+
+    def values(self) -> HashMapIterator:
+        """
+        Returns an iterator over the values of the hash map that reads the tables as it goes, without copying them
+        """
+        return HashMapIterator(self, (value for _, value, _ in self._entries()))
+
+    def items(self) -> HashMapIterator:
+        """
+        Returns an iterator over the (key, value) tuples of the hash map that reads the tables as it goes
+        """
+        return HashMapIterator(self, ((key, value) for key, value, _ in self._entries()))
+
+    def snapshot(self, path: str) -> None:
+        """
+        Writes the capacity, hash function, slot layout and stash of the hash map to a binary file, along with each
+        key, value and stored hash, so restore() rebuilds the same tables without hashing.
+
+        Args:
+            path: str - file to create or overwrite. The hash function must be registered in HASH_FUNCTIONS.
+        """
+        layout = bytearray(self._live) + bytearray([1]) * len(self._stash)
+        hashes = array('Q')
+        keys = []
+        values = []
+
+        for key, value, hash_value in self._entries():
+            hashes.append(hash_value)
+            keys.append(key)
+            values.append(value)
+
+        write_snapshot(path, self._SNAPSHOT_KIND, self._capacity, self._hash_function, layout, hashes, keys, values)
+
+    @classmethod
+    def restore(cls, path: str) -> "CuckooHashMap":
+        """
+        Returns a new hash map with the exact slot layout and stash stored by snapshot(). No key is hashed and no
+        resize takes place.
+
+        Args:
+            path: str - file written by snapshot()
+
+        Returns:
+            hash_map - the restored hash map
+        """
+        capacity, function, layout, hashes, keys, values = read_snapshot(path, cls._SNAPSHOT_KIND)
+        hash_map = cls(capacity, function)
+
+        position = 0
+        for index in range(capacity):
+            if layout[index]:
+                hash_map._hashes[index] = hashes[position]
+                hash_map._keys[index] = keys[position]
+                hash_map._values[index] = values[position]
+                hash_map._live[index] = 1
+                position += 1
+
+        # The entries after the slots are the stash
+        for position in range(position, len(keys)):
+            hash_map._stash.append(HashEntry(keys[position], values[position], hashes[position]))
+
+        hash_map._size = len(keys)
+        return hash_map
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._modifications += 1
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Create an independent iterator over the entries of the tables and the stash, yielding a HashEntry for each
+        """
+        return HashMapIterator(self, (HashEntry(key, value, hash_value)
+                                      for key, value, hash_value in self._entries()))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove example")
+    print("--------------------------")
+    m = CuckooHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    m.put('str0', 'overwritten')
+    m.remove('str1')
+    print(m.get('str0'), m.get('str1'), m.contains_key('str2'), m.get_size(), m.stats()['stashed'])
+
+    print("\nresize_table example")
+    print("--------------------")
+    m = CuckooHashMap(20, hash_function_2)
+    for i in range(40):
+        m.put(str(i), i)
+    m.resize_table(400)
+    print(m.get_size(), m.get_capacity(), all(m.get(str(i)) == i for i in range(40)))
+
+    print("\nanagram keys example")
+    print("--------------------")
+    import itertools
+    m = CuckooHashMap(11, hash_function_1)
+    for word in itertools.islice(itertools.permutations('abcdefgh'), 2000):
+        m.put(''.join(word), 1)
+    print(m.get_size(), m.get_capacity(), m.contains_key('abcdefhg'), m.stats()['reseeds'])
+
+    print("\nstash overflow example")
+    print("----------------------")
+    # Anagrams have equal hashes under hash_function_1, so they share both slots and the rest must be stashed
+    count = 2 + CuckooHashMap.STASH_SIZE + 1
+    words = [''.join(word) for word in itertools.islice(itertools.permutations('abcdefg'), count)]
+    m = CuckooHashMap(101, hash_function_1)
+    for word in words[:-1]:
+        m.put(word, 1)
+    print(m.stats()['stashed'] == CuckooHashMap.STASH_SIZE, m.stats()['reseeds'] == 0)
+    m.put(words[-1], 1)
+    print(m.stats()['reseeds'] == 1, m.get_size() == len(words), all(m.contains_key(word) for word in words))
+
+    print("\nbounded lookup example")
+    print("----------------------")
+    m = CuckooHashMap(11, hash_function_2)
+    m.put_many(('str' + str(i), i) for i in range(5000))
+    m.enable_stats()
+    found = all(m.get('str' + str(i)) == i for i in range(5000))
+    missing = not any(m.contains_key('missing' + str(i)) for i in range(5000))
+    stats = m.stats()['operations']
+    print(found, missing, max(stats['get']['max_probes'], stats['contains_key']['max_probes']) <= 2 + m.STASH_SIZE)
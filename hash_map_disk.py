@@ -0,0 +1,261 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements an on-disk, read-only open addressing hash table that is memory mapped and
+#              queried in place, so a large map can be shared by many processes and opened without rebuilding it.
+#
+#              The table is written from a hash_map_oa.HashMap, so it uses exactly the same quadratic probing and
+#              prime capacities. At most (capacity - 1) / 2 slots are filled, so every probe sequence reaches an empty
+#              slot. Lookups read the slot array and the key bytes directly from the mapped file. Only the value of a
+#              matching key is deserialized.
+#
+#              File format (all integers little-endian):
+#
+#              header   64 bytes: magic b'HMAPDSK1', version (u32), reserved (u32), capacity (u64), size (u64),
+#                                 hash function name (32 bytes, utf-8, zero padded)
+#              slots    capacity * 16 bytes: (hash (u64), record offset (u64)). An offset of 0 marks an empty slot.
+#              records  per entry: key length (u32), value length (u32), utf-8 key bytes, pickled value bytes
+#
+#              It includes the following public functions and class:
+#
+#              write_disk_table(path, hash_map) - Writes the layout of an open addressing HashMap to path
+#              build_disk_table(path, pairs, function_name, size_hint) - Builds an open addressing HashMap from
+#                                                                        key/value pairs and writes it to path
+#              DiskHashMap(path) - Memory maps a table written by write_disk_table. Supports get(key),
+#                                  contains_key(key), get_size(), get_capacity(), table_load() and close().
+
+import mmap
+import pickle
+import struct
+
+from a6_include import DynamicArray
+from hash_functions import HASH_FUNCTIONS, hash_function_name
+from hash_map_oa import HashMap
+from hash_map_primes import next_prime
+
+_MAGIC = b'HMAPDSK1'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIIQQ32s')
+_SLOT = struct.Struct('<QQ')
+_RECORD = struct.Struct('<II')
+
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class DiskTableError(Exception):
+    pass
+
+
+def write_disk_table(path: str, hash_map: HashMap) -> None:
+    """
+    Writes the live entries of an open addressing HashMap to path, in a slot array of the same capacity, or of the
+    next prime capacity at least twice the size if the map holds more than (capacity - 1) / 2 keys. Each entry is
+    placed again by quadratic probing from its stored hash, so tombstones of the map are left out of the file and the
+    map itself is not changed.
+
+    Args:
+        path: str - file to create or overwrite
+        hash_map: hash_map_oa.HashMap - the map to write. Its hash function must be registered in HASH_FUNCTIONS.
+    """
+    if type(hash_map) is not HashMap:
+        raise DiskTableError("write_disk_table needs a hash_map_oa.HashMap")
+
+    function_name = hash_function_name(hash_map._hash_function)
+    if function_name is None:
+        raise DiskTableError("only hash functions registered in hash_functions.HASH_FUNCTIONS can be stored")
+
+    # Quadratic probing on a prime capacity reaches (capacity + 1) / 2 distinct slots, so with at most
+    # (capacity - 1) / 2 entries every probe sequence reaches an empty slot
+    capacity = hash_map.get_capacity()
+    if 2 * hash_map.get_size() > capacity - 1:
+        capacity = next_prime(2 * hash_map.get_size() + 1)
+
+    slots = bytearray(_SLOT.size * capacity)
+    records_start = _HEADER.size + len(slots)
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, 0, capacity, hash_map.get_size(), function_name.encode()))
+        file.write(slots)
+
+        # Append each record and point its slot at it. The slots are written once all offsets are known
+        offset = records_start
+        for key, value, hash_value in hash_map._entries():
+            key = key.encode()
+            value = pickle.dumps(value)
+            file.write(_RECORD.pack(len(key), len(value)))
+            file.write(key)
+            file.write(value)
+
+            # Find the first empty slot on the probe sequence of the key, as DiskHashMap._find will probe it
+            index_initial = hash_value % capacity
+            index = index_initial
+            probe = 1
+            while _SLOT.unpack_from(slots, _SLOT.size * index)[1]:
+                if probe > capacity:
+                    raise DiskTableError("no empty slot on the probe sequence of a key")
+                index = (index_initial + probe * probe) % capacity
+                probe += 1
+
+            _SLOT.pack_into(slots, _SLOT.size * index, hash_value & _HASH_MASK, offset)
+            offset += _RECORD.size + len(key) + len(value)
+
+        file.seek(_HEADER.size)
+        file.write(slots)
+
+
+def build_disk_table(path: str, pairs, function_name: str = 'hash_function_1', size_hint: int = None) -> None:
+    """
+    Builds an open addressing HashMap from pairs with one up front resize and writes it to path.
+
+    Args:
+        path: str - file to create or overwrite
+        pairs: iterable or DynamicArray of (key, value) tuples
+        function_name: str - name of the hash function in HASH_FUNCTIONS
+        size_hint: int - expected number of pairs. Without it, pairs that have no length (for example a generator)
+                         are read into a list first to count them.
+    """
+    if size_hint is None and not hasattr(pairs, '__len__') and not isinstance(pairs, DynamicArray):
+        pairs = list(pairs)
+
+    hash_map = HashMap(11, HASH_FUNCTIONS[function_name])
+    hash_map.put_many(pairs, size_hint)
+    write_disk_table(path, hash_map)
+
+
+class DiskHashMap:
+    def __init__(self, path: str) -> None:
+        """
+        Initialize a read-only map over the table stored at path. The file is memory mapped, so opening it costs
+        the same regardless of its size, and processes opening the same file share its pages.
+        """
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise DiskTableError(f"{path} is empty")
+
+        magic, version, _, capacity, size, function_name = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise DiskTableError(f"{path} is not a hash table file")
+
+        function_name = function_name.rstrip(b'\0').decode()
+        if function_name not in HASH_FUNCTIONS:
+            self.close()
+            raise DiskTableError(f"{path} uses unknown hash function {function_name}")
+
+        self._capacity = capacity
+        self._size = size
+        self._hash_function = HASH_FUNCTIONS[function_name]
+
+    def __enter__(self) -> "DiskHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the map at the end of a with statement."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps the file
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the hash table load factor
+        """
+        return self._size / self._capacity
+
+    def _find(self, key: str) -> int:
+        """
+        Returns the file offset of the record holding key, or 0 if the key does not exist in the table
+        """
+        buffer = self._mmap
+        hash_value = self._hash_function(key)
+        stored_hash = hash_value & _HASH_MASK
+        encoded_key = None
+
+        index_initial = hash_value % self._capacity
+        index = index_initial
+        probe = 1
+
+        # A table written by write_disk_table always has an empty slot on the probe sequence. The bound only guards
+        # against damaged files
+        while probe <= self._capacity:
+            slot_hash, offset = _SLOT.unpack_from(buffer, _HEADER.size + _SLOT.size * index)
+
+            # An empty slot ends the probe sequence
+            if offset == 0:
+                return 0
+
+            # Compare stored hashes first, and the key bytes only when they match
+            if slot_hash == stored_hash:
+                if encoded_key is None:
+                    encoded_key = key.encode()
+                key_length, _ = _RECORD.unpack_from(buffer, offset)
+                key_start = offset + _RECORD.size
+                if key_length == len(encoded_key) and buffer[key_start:key_start + key_length] == encoded_key:
+                    return offset
+
+            # Determine next index using quadratic probing scheme
+            index = (index_initial + probe * probe) % self._capacity
+            probe += 1
+
+        return 0
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key if the key exists in the table, otherwise None
+        """
+        offset = self._find(key)
+        if offset:
+            key_length, value_length = _RECORD.unpack_from(self._mmap, offset)
+            value_start = offset + _RECORD.size + key_length
+            return pickle.loads(self._mmap[value_start:value_start + value_length])
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the table, otherwise it returns False
+        """
+        return self._find(key) != 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    path = os.path.join(tempfile.mkdtemp(), 'table.hmap')
+
+    print("\nbuild / open example")
+    print("--------------------")
+    start = time.perf_counter()
+    build_disk_table(path, (('str' + str(i), i * 100) for i in range(20000)), 'fnv1a', 20000)
+    print(f"built in {time.perf_counter() - start:.2f} s, {os.path.getsize(path)} bytes")
+
+    start = time.perf_counter()
+    with DiskHashMap(path) as m:
+        print(f"opened in {(time.perf_counter() - start) * 1000:.2f} ms")
+        print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+        print(m.get('str0'), m.get('str19999'), m.get('missing'), m.contains_key('str123'), m.contains_key('str20000'))
+
+    os.remove(path)
@@ -0,0 +1,99 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Methods shared by the HashMap implementations, written in terms of the methods every map defines.
+#
+#              A map class lists MapMethods as its base class and provides _hash_function, get(key), remove(key),
+#              _put_hashed(key, value, hash_value), _upsert_hashed(key, fn, default, hash_value) and _reserve(count).
+#
+#              MapMethods adds the following public methods:
+#
+#              setdefault(key, default) - Returns the value of key, adding key with default first if it is missing
+#              increment(key, delta) - Adds delta to the value of key, treating a missing key as 0
+#              put_many(pairs, size_hint) - Updates or adds many key/value pairs, resizing the table at most once
+#              get_many(keys) - Returns a dynamic array with the value associated with each of the given keys
+#              remove_many(keys) - Removes each of the given keys from the hash map
+
+from a6_include import DynamicArray
+
+
+def _unchanged(value: object) -> object:
+    """
+    Returns value unchanged. Used by setdefault to keep an existing value.
+    """
+    return value
+
+
+class MapMethods:
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the hash map, it is added with default
+        as its value first.
+        """
+        return self._upsert_hashed(key, _unchanged, default, self._hash_function(key))
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the value associated with the given key, adding the key with the value delta if it is not in
+        the hash map, and returns the new value.
+        """
+        return self._upsert_hashed(key, lambda value: value + delta, 0, self._hash_function(key))
+
+    def put_many(self, pairs, size_hint: int = None) -> None:
+        """
+        Updates or adds every key/value pair in pairs. The table is resized at most once up front, from len(pairs) or
+        size_hint, instead of doubling repeatedly while the pairs are added.
+
+        Args:
+            pairs: iterable or DynamicArray of (key, value) tuples
+            size_hint: int - expected number of pairs, used when pairs has no length (for example a generator)
+
+        Returns:
+            None - key/value pairs will be updated or added to the hash map
+        """
+        if isinstance(pairs, DynamicArray):
+            pairs = [pairs[index] for index in range(pairs.length())]
+
+        if size_hint is None and hasattr(pairs, '__len__'):
+            size_hint = len(pairs)
+        if size_hint:
+            self._reserve(size_hint)
+
+        # The hash function is looked up for every pair, since a put may replace it (see enable_flood_protection)
+        put_hashed = self._put_hashed
+        for key, value in pairs:
+            put_hashed(key, value, self._hash_function(key))
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a dynamic array with the value associated with each key in keys, in the same order.
+        None is stored for keys that do not exist in the hash map.
+
+        Args:
+            keys: iterable or DynamicArray of keys
+
+        Returns:
+            da - dynamic array of values
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[index] for index in range(keys.length())]
+
+        get = self.get
+        return DynamicArray([get(key) for key in keys])
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes every key in keys and its associated value from the hash map. Keys that are not in the hash map are
+        ignored.
+
+        Args:
+            keys: iterable or DynamicArray of keys
+
+        Returns:
+            None - the key/value pairs will be removed if found.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[index] for index in range(keys.length())]
+
+        remove = self.remove
+        for key in keys:
+            remove(key)
@@ -13,24 +13,74 @@
 #              resize_table(new_capacity) - Changes the capacity of the underlying dynamic array and rehashes existing
 #                                           key/value pairs
 #              table_load() - Returns the load factor of the hash map
-#              empty_buckets() - Returns the number of empty buckets in the hash map
+#              empty_buckets() - Returns the number of empty buckets in the hash map, not counting tombstones
+#              compact() - Rehashes all live key/value pairs into a table of the same capacity, removing tombstones
+#              enable_stats() / disable_stats() - Starts or stops recording probe lengths, resizes and collisions
+#              stats() - Returns a dictionary with the number of live, tombstone and empty buckets and, if enabled, the
+#                        recorded statistics
+#              enable_shrink(low_water, min_capacity) / disable_shrink() - Starts or stops shrinking the table in
+#                                                                         remove once the load factor is below low_water
+#              enable_flood_protection(max_probes) / disable_flood_protection() - Starts or stops replacing the hash
+#                  function by a randomly seeded SipHash function, and rehashing, once a put probes past max_probes
+#              enable_adaptive_hashing(sample_size, functions) / disable_adaptive_hashing() - Starts or stops choosing
+#                  the hash function again at every resize, from its spread over a sample of the keys
+#              enable_bloom_filter(bits_per_key) / disable_bloom_filter() - Starts or stops rejecting most missing keys
+#                  in get and contains_key with a Bloom filter, before probing
 #              get(key) - Returns the value associated with the given key if the key exists in the hash map
 #              contains_key(key) - Returns True if the given key exists in the hash map. False, if not.
 #              remove(key) - Removes the value associated with the given key from the hash map
+#              upsert(key, fn, default) - Replaces the value of key with fn(value), or adds key with fn(default)
+#              setdefault(key, default) - Returns the value of key, adding key with default first if it is missing
+#              increment(key, delta) - Adds delta to the value of key, treating a missing key as 0
+#              put_many(pairs, size_hint) - Updates or adds many key/value pairs, resizing the table at most once
+#              get_many(keys) - Returns a dynamic array with the value associated with each of the given keys
+#              remove_many(keys) - Removes each of the given keys from the hash map
+#              snapshot(path) - Writes the slot layout, including tombstones, and every entry to a binary file
+#              restore(path) - Class method returning a HashMap rebuilt from a snapshot without hashing any key
 #              get_keys_and_values() - Returns a dynamic array where each index contains a tuple of each key/value pair
 #                                      stored in the hash map.
+#              keys(), values(), items() - Return independent iterators over the keys, values or (key, value) tuples
+#                                          of the hash map. They raise RuntimeError if the map gains or loses keys
+#                                          during iteration.
 #              clear() - Clears the contents of the hash map. It does not change the underlying hash table capacity
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
+import itertools
+import time
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, HashMapIterator,
                         hash_function_1, hash_function_2)
+from hash_functions import make_siphash_function, select_hash_function
+from hash_map_bloom import BloomFilter
+from hash_map_methods import MapMethods
+from hash_map_primes import grown_capacity, is_prime, next_prime
+from hash_map_snapshot import read_snapshot, write_snapshot
+from hash_map_stats import MapStats
+
+# Slot states recorded in snapshots
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+
+class HashMap(MapMethods):
+    # Fraction of the table that may hold tombstones before remove compacts the table
+    TOMBSTONE_THRESHOLD = 0.25
 
+    # Maps with fewer keys keep their hash function, because a sample that small says little about the spread
+    ADAPTIVE_MIN_KEYS = 100
+
+    # Layout kind written to snapshots. Only maps using the same probing scheme can restore each other's snapshots
+    _SNAPSHOT_KIND = 'oa'
+
+    # Opt-in settings given to the empty copies made by _empty_copy()
+    _COPIED_STATE = ('_shrink_load', '_min_capacity', '_flood_limit', '_reseeds', '_adaptive_sample',
+                     '_adaptive_functions', '_hash_switches')
 
-class HashMap:
     def __init__(self, capacity: int, function) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         self._buckets = DynamicArray()
 
@@ -41,6 +91,39 @@ class HashMap:
 
         self._hash_function = function
         self._size = 0
+        self._init_state()
+
+    def _init_state(self) -> None:
+        """
+        Initializes the bookkeeping and opt-in settings of a new map, every feature disabled
+        """
+        # Number of tombstones currently in the table. Reset by clear()
+        self._tombstones = 0
+
+        # Number of times keys were added or removed or the table was rebuilt. Iterators compare it to detect changes
+        self._modifications = 0
+
+        # MapStats collecting operation statistics, or None while statistics are disabled. See enable_stats()
+        self._stats = None
+
+        # Load factor below which remove shrinks the table, or 0 while shrinking is disabled. See enable_shrink()
+        self._shrink_load = 0.0
+        self._min_capacity = 11
+
+        # Probe length that triggers a rehash with a seeded hash function, or 0 while disabled, and the number of
+        # such rehashes. See enable_flood_protection()
+        self._flood_limit = 0
+        self._reseeds = 0
+
+        # Number of keys sampled at each resize to choose the hash function, or 0 while disabled, the candidate
+        # functions (None for all of HASH_FUNCTIONS) and the number of times the function was changed.
+        # See enable_adaptive_hashing()
+        self._adaptive_sample = 0
+        self._adaptive_functions = None
+        self._hash_switches = 0
+
+        # BloomFilter holding the hash of every key, or None while disabled. See enable_bloom_filter()
+        self._bloom = None
 
     def __str__(self) -> str:
         """
@@ -113,38 +196,114 @@ class HashMap:
         Returns:
             None - key/value pair will be updated or added to the hash map
         """
-        # Check the load factor and resize the table if greater than or equal to 1
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        self._put_hashed(key, value, self._hash_function(key))
 
-        # Initialize new HashEntry, and determine the index for the given key
-        hash_entry = HashEntry(key, value)
-        hash_value = self._hash_function(key)
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Updates the key/value pair in the hash map using an already computed hash of the key.
+        Used by put and resize_table so that keys are never hashed more than once.
+        """
+        hash_value = self._before_put(key, hash_value)
+
+        # If the key exists, replace its entry with a new hash entry. Otherwise add one at the index found
+        index, found, probe = self._probe(key, hash_value)
+        if found:
+            self._buckets[index] = HashEntry(key, value, hash_value)
+            if self._stats is not None:
+                self._stats.record('put', probe)
+            return
+
+        self._insert(index, HashEntry(key, value, hash_value), probe, 'put')
+
+    def _before_put(self, key: str, hash_value: int) -> int:
+        """
+        Prepares the table for a put or upsert of key and returns the hash to store key with. The Bloom filter, if
+        enabled, is given that hash.
+        """
+        # Keep live entries and tombstones at no more than half the table once the key is added, so every probe
+        # sequence of a prime table, which visits (capacity + 1) / 2 distinct buckets, reaches an empty bucket. Grow
+        # the table if live entries alone would pass half of it, otherwise compact it to reclaim the tombstones
+        function = self._hash_function
+        if (self._size + self._tombstones + 1) / self._capacity > 0.5:
+            if (self._size + 1) / self._capacity > 0.5:
+                self.resize_table(self._grown_capacity())
+            else:
+                self.compact()
+
+        # Adaptive hashing may have replaced the hash function while resizing, in which case the key is hashed again
+        if self._hash_function is not function:
+            hash_value = self._hash(key)
+
+        if self._bloom is not None:
+            self._bloom.add(hash_value)
+        return hash_value
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the hash of key as stored in the table
+        """
+        return self._hash_function(key)
+
+    def _grown_capacity(self) -> int:
+        """
+        Returns the capacity the table grows to once a new key would make it more than half full
+        """
+        return grown_capacity(self._capacity)
+
+    def _probe(self, key: str, hash_value: int) -> tuple:
+        """
+        Walks the probe sequence of key up to the first empty bucket.
+
+        Returns:
+            result: tuple - (index, found, probe). If found is True, index is the bucket holding the live entry of
+                            key. Otherwise it is the bucket a new entry for key goes in: the first tombstone passed,
+                            or else the empty bucket ending the sequence. probe is the number of buckets visited.
+        """
         index_initial = hash_value % self._capacity
         index = index_initial
         probe = 1
+        first_tombstone = None
 
         # If an object exists at index, check its key and tombstone property. Move to next index if needed
         while self._buckets[index]:
+            entry = self._buckets[index]
 
-            # If matching key is found and object is not a tombstone, replace it with the new hash entry.
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                self._buckets[index] = hash_entry
-                return
+            # Compare cached hashes first so that most mismatches never compare keys
+            if entry.hash_value == hash_value and entry.key == key and not entry.is_tombstone:
+                return index, True, probe
 
-            # If matching key is found and object is a tombstone, replace it with the new hash entry and update size
-            if self._buckets[index].key == key and self._buckets[index].is_tombstone:
-                self._buckets[index] = hash_entry
-                self._size += 1
-                return
+            # Remember the first tombstone on the probe path so a new key can reuse it
+            if first_tombstone is None and entry.is_tombstone:
+                first_tombstone = index
 
             # Determine next index using quadratic probing scheme
             index = (index_initial + probe ** 2) % self._capacity
             probe += 1
 
-        # When we reach an open index, add in the new hash entry and update size
-        self._buckets[index] = hash_entry
+        if first_tombstone is not None:
+            return first_tombstone, False, probe
+        return index, False, probe
+
+    def _insert(self, index: int, entry: HashEntry, probe: int, operation: str) -> None:
+        """
+        Stores the entry of a key that is not in the hash map at the bucket _probe returned for it.
+        probe is the number of buckets _probe visited, and operation names the calling method in the recorded
+        statistics.
+        """
+        # The bucket is either empty or holds a tombstone that the new entry replaces
+        if self._buckets[index] is not None:
+            self._tombstones -= 1
+        self._buckets[index] = entry
         self._size += 1
+        self._modifications += 1
+
+        if self._stats is not None:
+            self._stats.record(operation, probe)
+            self._stats.record_insert(probe > 1)
+
+        # Rehash with a seeded hash function if the probe sequence is abnormally long
+        if self._flood_limit and probe > self._flood_limit:
+            self._reseed()
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -164,17 +323,40 @@ class HashMap:
             return
 
         # new_capacity must be prime. If it is not prime, change it to the next prime number
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        # In adaptive mode, rehash every key if another hash function suits the current keys better
+        if self._adaptive_sample:
+            function = self._select_hash_function(new_capacity)
+            if function is not self._hash_function:
+                self._rehash_with(function, new_capacity)
+                return
 
-        # Store the keys and values of each element in the table. Update self._capacity and clear the hash table
-        da = self.get_keys_and_values()
+        # Puts made while rehashing are part of the resize, so they are not recorded as operations and cannot
+        # trigger a rehash with another hash function
+        stats, self._stats = self._stats, None
+        flood_limit, self._flood_limit = self._flood_limit, 0
+        adaptive_sample, self._adaptive_sample = self._adaptive_sample, 0
+        start = time.perf_counter()
+
+        # Store the live entries of the table. Update self._capacity and clear the hash table
+        da = DynamicArray()
+        for element in self:
+            da.append(element)
         self._capacity = new_capacity
         self.clear()
 
-        # Loop through the keys & values and add them to the new hash table
+        # Loop through the entries and add them to the new hash table using their cached hash values
         for index in range(da.length()):
-            self.put(da[index][0], da[index][1])
+            entry = da[index]
+            self._put_hashed(entry.key, entry.value, entry.hash_value)
+
+        self._stats = stats
+        self._flood_limit = flood_limit
+        self._adaptive_sample = adaptive_sample
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
 
     def table_load(self) -> float:
         """
@@ -184,9 +366,192 @@ class HashMap:
 
     def empty_buckets(self) -> int:
         """
-        Returns the number of empty buckets in the hash table
+        Returns the number of empty buckets in the hash table. Buckets holding tombstones are not empty.
+        """
+        return self._capacity - self._size - self._tombstones
+
+    def compact(self) -> None:
+        """
+        Rehashes all live entries into a table of the same capacity, reclaiming every tombstone.
+        """
+        self.resize_table(self._capacity)
+
+    def _reseed(self) -> None:
+        """
+        Replaces the hash function by a SipHash function with a random seed of its own and rehashes every live entry
+        into a table of the same capacity. A map whose hash function is already seeded is left unchanged.
+        """
+        if getattr(self._hash_function, 'seed', None) is not None:
+            return
+
+        self._reseeds += 1
+        self._rehash_with(make_siphash_function(), self._capacity)
+
+    def _select_hash_function(self, capacity: int) -> callable:
+        """
+        Returns the hash function adaptive hashing chooses for a table of the given capacity, measured on a sample of
+        the keys spread at the same load factor. A seeded function set by flood protection is always kept.
+        """
+        if getattr(self._hash_function, 'seed', None) is not None or self._size < self.ADAPTIVE_MIN_KEYS:
+            return self._hash_function
+
+        # Take every step-th key, so the sample is spread over the whole table
+        step = max(1, self._size // self._adaptive_sample)
+        sample = [key for key, _, _ in itertools.islice(self._entries(), 0, None, step)]
+        sample_capacity = max(1, round(len(sample) * capacity / self._size))
+
+        return select_hash_function(sample, sample_capacity, self._adaptive_functions, self._hash_function)
+
+    def _rehash_with(self, function: callable, capacity: int) -> None:
+        """
+        Replaces the hash function by function and rehashes every live entry into a table of the given capacity
+        """
+        stats, self._stats = self._stats, None
+        flood_limit, self._flood_limit = self._flood_limit, 0
+        adaptive_sample, self._adaptive_sample = self._adaptive_sample, 0
+        start = time.perf_counter()
+
+        entries = list(self._entries())
+        if function is not self._hash_function:
+            self._hash_function = function
+            self._hash_switches += 1
+        self._capacity = capacity
+        self.clear()
+
+        for key, value, _ in entries:
+            self._put_hashed(key, value, function(key))
+
+        self._stats = stats
+        self._flood_limit = flood_limit
+        self._adaptive_sample = adaptive_sample
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
+
+    def enable_stats(self) -> None:
+        """
+        Starts recording probe lengths, resizes and collisions for every operation. See stats()
+        """
+        if self._stats is None:
+            self._stats = MapStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording operation statistics and discards those recorded so far
         """
-        return self._capacity - self._size
+        self._stats = None
+
+    def enable_shrink(self, low_water: float = 0.125, min_capacity: int = 11) -> None:
+        """
+        Makes remove shrink the table when the load factor drops below low_water. The table shrinks to a load factor
+        of twice low_water, so a map must lose or gain a large share of its keys before it resizes again.
+
+        Args:
+            low_water: float - load factor below which the table shrinks. Must be above 0 and below 0.25
+            min_capacity: int - the table never shrinks below this capacity
+        """
+        if not 0 < low_water < 0.25:
+            raise ValueError("low_water must be above 0 and below 0.25")
+
+        self._shrink_load = low_water
+        self._min_capacity = min_capacity
+
+    def disable_shrink(self) -> None:
+        """
+        Stops remove from shrinking the table
+        """
+        self._shrink_load = 0.0
+
+    def enable_flood_protection(self, max_probes: int = 64) -> None:
+        """
+        Makes put and upsert watch the number of buckets they probe to add a new key. Once a put probes more than
+        max_probes buckets, which does not happen by chance with a good hash function, the hash function is replaced
+        by a SipHash function with a random seed of its own and every key is rehashed. Keys chosen to collide (for
+        example anagrams under hash_function_1) are spread out again, and cannot be predicted to collide under the
+        new seed.
+
+        Args:
+            max_probes: int - longest probe sequence accepted before rehashing
+        """
+        self._flood_limit = max(1, max_probes)
+
+    def disable_flood_protection(self) -> None:
+        """
+        Stops watching probe lengths. A hash function already replaced is kept.
+        """
+        self._flood_limit = 0
+
+    def enable_adaptive_hashing(self, sample_size: int = 1000, functions: dict = None) -> None:
+        """
+        Makes resize_table choose the hash function again each time the table is resized or compacted. Up to
+        sample_size keys are hashed by each candidate into a table with the load factor of the resized one. The
+        current function is kept while it spreads them about as evenly as a random function, and otherwise the
+        function spreading them most evenly is used (see hash_functions.select_hash_function). If it is not the
+        current function, every key is rehashed with it instead of reusing its stored hash. A hash function set by
+        flood protection is never replaced.
+
+        Args:
+            sample_size: int - most keys measured at each resize
+            functions: dict - candidate hash functions by name. Defaults to every function in HASH_FUNCTIONS
+        """
+        self._adaptive_sample = max(1, sample_size)
+        self._adaptive_functions = functions
+
+    def disable_adaptive_hashing(self) -> None:
+        """
+        Stops choosing the hash function at resize. The function in use is kept.
+        """
+        self._adaptive_sample = 0
+
+    def enable_bloom_filter(self, bits_per_key: int = 10) -> None:
+        """
+        Puts a Bloom filter in front of get and contains_key. The filter holds the hash of every key put into the map,
+        so a key whose hash it does not hold is reported missing without probing, however many tombstones its probe
+        sequence would cross. Put and upsert pay for setting the bits of the key. The filter is rebuilt with the
+        table by resize_table, compact and clear, and its false positive rate is reported by stats().
+
+        Args:
+            bits_per_key: int - bits of the filter per key the table holds before growing. 10 bits give about 1%
+                                false positives
+        """
+        self._bloom = BloomFilter(self._capacity // 2, bits_per_key)
+        for _, _, hash_value in self._entries():
+            self._bloom.add(hash_value)
+
+    def disable_bloom_filter(self) -> None:
+        """
+        Removes the Bloom filter and its statistics
+        """
+        self._bloom = None
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary describing how the buckets of the hash table are used and, if enabled, the operations
+        made on it.
+
+        Returns:
+            stats: dict - capacity, live (entries), tombstones, empty (buckets), load (live entries / capacity),
+                          occupancy ((live entries + tombstones) / capacity), reseeds (rehashes made by flood
+                          protection) and hash_switches (hash functions replaced by flood protection or adaptive
+                          hashing). While the Bloom filter is enabled, bloom holds its BloomFilter report. While
+                          statistics are enabled it also contains the MapStats report: probe length
+                          histogram, average and max probes per operation, resize count and time, and the share of
+                          inserts that collided.
+        """
+        stats = {
+            'capacity': self._capacity,
+            'live': self._size,
+            'tombstones': self._tombstones,
+            'empty': self.empty_buckets(),
+            'load': self.table_load(),
+            'occupancy': (self._size + self._tombstones) / self._capacity,
+            'reseeds': self._reseeds,
+            'hash_switches': self._hash_switches,
+        }
+        if self._bloom is not None:
+            stats['bloom'] = self._bloom.report()
+        if self._stats is not None:
+            stats.update(self._stats.report())
+        return stats
 
     def get(self, key: str) -> object:
         """
@@ -201,21 +566,34 @@ class HashMap:
         """
         # Determine the index for the given key
         hash_value = self._hash_function(key)
+
+        # Most missing keys are rejected by the Bloom filter without probing
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return None
+
         index_initial = hash_value % self._capacity
         index = index_initial
         probe = 1
 
-        # If an object exists at index, compare its key to the input key
-        while self._buckets[index]:
+        # If an object exists at index, compare its key to the input key. No probe sequence is longer than the table
+        while self._buckets[index] and probe <= self._capacity:
 
             # If the keys match, return the value of the object
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
+            if self._buckets[index].hash_value == hash_value and self._buckets[index].key == key \
+                    and not self._buckets[index].is_tombstone:
+                if self._stats is not None:
+                    self._stats.record('get', probe)
                 return self._buckets[index].value
 
             # Determine next index using quadratic probing scheme
             index = (index_initial + probe ** 2) % self._capacity
             probe += 1
 
+        if self._stats is not None:
+            self._stats.record('get', probe)
+        if self._bloom is not None:
+            self._bloom.record_false_positive()
+
     def contains_key(self, key: str) -> bool:
         """
         Returns True if the given key is in the hash map, otherwise it returns False.
@@ -229,22 +607,35 @@ class HashMap:
         """
         # Determine the index for the given key
         hash_value = self._hash_function(key)
+
+        # Most missing keys are rejected by the Bloom filter without probing
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return False
+
         index_initial = hash_value % self._capacity
         index = index_initial
         probe = 1
 
-        # If an object exists at index, compare its key to the input key
-        while self._buckets[index]:
+        # If an object exists at index, compare its key to the input key. No probe sequence is longer than the table
+        while self._buckets[index] and probe <= self._capacity:
 
             # If the keys match, return True
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
+            if self._buckets[index].hash_value == hash_value and self._buckets[index].key == key \
+                    and not self._buckets[index].is_tombstone:
+                if self._stats is not None:
+                    self._stats.record('contains_key', probe)
                 return True
 
             # Determine next index using quadratic probing scheme
             index = (index_initial + probe ** 2) % self._capacity
             probe += 1
 
+        if self._stats is not None:
+            self._stats.record('contains_key', probe)
+
         # If key was not found, return False
+        if self._bloom is not None:
+            self._bloom.record_false_positive()
         return False
 
     def remove(self, key: str) -> None:
@@ -264,19 +655,101 @@ class HashMap:
         index = index_initial
         probe = 1
 
-        # If an object exists at index, compare its key to the input key
-        while self._buckets[index]:
+        # If an object exists at index, compare its key to the input key. No probe sequence is longer than the table
+        while self._buckets[index] and probe <= self._capacity:
 
             # If the keys match, remove it by setting its tombstone data member to True
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
+            if self._buckets[index].hash_value == hash_value and self._buckets[index].key == key \
+                    and not self._buckets[index].is_tombstone:
                 self._buckets[index].is_tombstone = True
                 self._size -= 1
+                self._tombstones += 1
+                self._modifications += 1
+
+                if self._stats is not None:
+                    self._stats.record('remove', probe)
+
+                # Shrink the table if the load factor dropped below the low-water mark. Otherwise compact the table
+                # once tombstones take up too much of it
+                capacity = self._shrink_capacity()
+                if capacity:
+                    self.resize_table(capacity)
+                elif self._tombstones >= self.TOMBSTONE_THRESHOLD * self._capacity:
+                    self.compact()
                 return
 
             # Determine next index using quadratic probing scheme
             index = (index_initial + probe ** 2) % self._capacity
             probe += 1
 
+        if self._stats is not None:
+            self._stats.record('remove', probe)
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by fn(value), or adds the key with the value fn(default) if
+        it is not in the hash map. The key is hashed and its probe sequence walked only once, and an existing entry
+        is updated in place.
+
+        Args:
+            key: str - the key to update or add
+            fn: callable - called with the current value, or with default for a new key, and returns the new value
+            default: object - the value passed to fn when the key is not in the hash map
+
+        Returns:
+            value: object - the new value associated with the key
+        """
+        return self._upsert_hashed(key, fn, default, self._hash_function(key))
+
+    def _upsert_hashed(self, key: str, fn: callable, default: object, hash_value: int) -> object:
+        """
+        Implements upsert using an already computed hash of the key.
+        """
+        hash_value = self._before_put(key, hash_value)
+
+        # Live matching entry: update its value in place. Otherwise add a new entry at the index found
+        index, found, probe = self._probe(key, hash_value)
+        if found:
+            entry = self._buckets[index]
+            entry.value = fn(entry.value)
+            if self._stats is not None:
+                self._stats.record('upsert', probe)
+            return entry.value
+
+        value = fn(default)
+        self._insert(index, HashEntry(key, value, hash_value), probe, 'upsert')
+        return value
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the capacity needed to add count more keys without the load factor passing 0.5, or 0 if the current
+        capacity is already enough.
+        """
+        if (self._size + count) / self._capacity > 0.5:
+            return 2 * (self._size + count)
+        return 0
+
+    def _shrink_capacity(self) -> int:
+        """
+        Returns the capacity to shrink the table to, or 0 if shrinking is disabled or the load factor is not below the
+        low-water mark. Only capacities at most half the current one are returned, so a shrink always frees memory.
+        """
+        if self._size >= self._shrink_load * self._capacity:
+            return 0
+
+        capacity = max(self._min_capacity, int(self._size / (2 * self._shrink_load)) + 1)
+        if capacity > self._capacity // 2:
+            return 0
+        return capacity
+
+    def _reserve(self, count: int) -> None:
+        """
+        Resizes the table once so that count more keys can be added without the load factor passing 0.5.
+        """
+        capacity = self._capacity_for(count)
+        if capacity:
+            self.resize_table(capacity)
+
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a dynamic array where each index contains a tuple of each key/value pair stored in the hash map.
@@ -295,45 +768,155 @@ class HashMap:
 
         return da
 
-    def clear(self) -> None:
+    def _entries(self):
         """
-        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        Yields (key, value, hash_value) for every key/value pair stored in the hash map, one bucket at a time,
+        without building a dynamic array.
         """
-        # To clear the contents of the hash map, set self._buckets to a new Dynamic Array, repopulate with None objects,
-        # and update self._size
-        self._buckets = DynamicArray()
+        for index in range(self._capacity):
+            entry = self._buckets[index]
+            if entry is not None and not entry.is_tombstone:
+                yield entry.key, entry.value, entry.hash_value
 
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+    def _empty_copy(self, capacity: int) -> "HashMap":
+        """
+        Returns an empty map of the same class and hash function with the given capacity and the opt-in settings of
+        this map. Statistics are not copied. An enabled Bloom filter is replaced by an empty one for the new capacity.
+        """
+        hash_map = type(self)(capacity, self._hash_function)
+        for name in self._COPIED_STATE:
+            setattr(hash_map, name, getattr(self, name))
 
-        self._size = 0
+        # clear() sizes the new filter for the capacity of the map
+        if self._bloom is not None:
+            hash_map._bloom = self._bloom
+            hash_map.clear()
+        return hash_map
 
-    def __iter__(self):
+    def _empty_copy_steps(self, capacity: int, chunk_size: int):
+        """
+        Generator building the same map as _empty_copy(capacity), chunk_size buckets at a time. It yields None after
+        each chunk and the new map last, so a coroutine can yield to the event loop between chunks.
+        """
+        hash_map = self._empty_copy(1)
+        capacity = self._next_prime(capacity)
+
+        buckets = DynamicArray()
+        append = buckets.append
+        while buckets.length() < capacity:
+            for _ in range(min(chunk_size, capacity - buckets.length())):
+                append(None)
+            yield None
+
+        hash_map._buckets = buckets
+        hash_map._capacity = capacity
+        if hash_map._bloom is not None:
+            hash_map._bloom = hash_map._bloom.cleared(capacity // 2)
+        yield hash_map
+
+    def keys(self) -> HashMapIterator:
         """
-        Create iterator for loop
+        Returns an iterator over the keys of the hash map that reads the buckets as it goes, without copying them
         """
-        self._index = 0
+        return HashMapIterator(self, (key for key, _, _ in self._entries()))
 
-        return self
+    def values(self) -> HashMapIterator:
+        """
+        Returns an iterator over the values of the hash map that reads the buckets as it goes, without copying them
+        """
+        return HashMapIterator(self, (value for _, value, _ in self._entries()))
 
-    def __next__(self):
+    def items(self) -> HashMapIterator:
         """
-        Obtain next value and advance iterator
+        Returns an iterator over (key, value) tuples of the hash map that reads the buckets as it goes, without
+        copying them
         """
-        try:
-            # Move iterator to the next non-tombstone entry in the table
-            while self._buckets[self._index] is None or self._buckets[self._index].is_tombstone:
-                self._index += 1
+        return HashMapIterator(self, ((key, value) for key, value, _ in self._entries()))
 
-            value = self._buckets[self._index]
+    def snapshot(self, path: str) -> None:
+        """
+        Writes the capacity, hash function and slot layout of the hash map to a binary file, along with each key,
+        value and cached hash. Tombstones are kept, so every probe sequence is the same after restore().
 
-            # Increment iterator
-            self._index += 1
+        Args:
+            path: str - file to create or overwrite. The hash function must be registered in HASH_FUNCTIONS.
+        """
+        states = bytearray(self._capacity)
+        hashes = array('Q')
+        keys = []
+        values = []
 
-        except DynamicArrayException:
-            raise StopIteration
+        for index in range(self._capacity):
+            entry = self._buckets[index]
+            if entry is None:
+                continue
 
-        return value
+            states[index] = _TOMBSTONE if entry.is_tombstone else _LIVE
+            hashes.append(entry.hash_value)
+            keys.append(entry.key)
+            values.append(entry.value)
+
+        write_snapshot(path, self._SNAPSHOT_KIND, self._capacity, self._hash_function, states, hashes, keys, values)
+
+    @classmethod
+    def restore(cls, path: str) -> "HashMap":
+        """
+        Returns a new hash map with the exact slot layout stored by snapshot(). No key is hashed and no resize
+        takes place.
+
+        Args:
+            path: str - file written by snapshot()
+
+        Returns:
+            hash_map - the restored hash map
+        """
+        capacity, function, states, hashes, keys, values = read_snapshot(path, cls._SNAPSHOT_KIND)
+        hash_map = cls(capacity, function)
+
+        position = 0
+        for index in range(capacity):
+            if states[index] == _EMPTY:
+                continue
+
+            entry = HashEntry(keys[position], values[position], hashes[position])
+            if states[index] == _TOMBSTONE:
+                entry.is_tombstone = True
+                hash_map._tombstones += 1
+            else:
+                hash_map._size += 1
+
+            hash_map._buckets[index] = entry
+            position += 1
+
+        return hash_map
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map. It does not change the underlying hash table capacity.
+        """
+        # To clear the contents of the hash map, set self._buckets to a new Dynamic Array, repopulate with None objects,
+        # and reset self._size and the tombstone count
+        self._buckets = DynamicArray()
+
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
+
+        # Keys are put back by resize_table and compact, which rebuild the Bloom filter for the new capacity
+        if self._bloom is not None:
+            self._bloom = self._bloom.cleared(self._capacity // 2)
+
+    def __iter__(self) -> HashMapIterator:
+        """
+        Create an independent iterator over the live HashEntry objects of the table, so nested loops over the same
+        map do not share a position
+        """
+        buckets = self._buckets
+        return HashMapIterator(self, (buckets[index] for index in range(self._capacity)
+                                      if buckets[index] is not None and not buckets[index].is_tombstone))
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -544,3 +1127,77 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nupsert / setdefault / increment example")
+    print("---------------------------------------")
+    m = HashMap(11, hash_function_1)
+    for word in ['apple', 'pear', 'apple', 'plum', 'apple']:
+        m.increment(word)
+    print(m.get('apple'), m.upsert('pear', lambda value: value * 10, 0), m.upsert('fig', lambda value: value + 1, 0))
+    print(m.setdefault('plum', 5), m.setdefault('kiwi', 5), m.get_size())
+
+    print("\nkeys(), values(), items() example")
+    print("--------------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(5):
+        m.put('str' + str(i), i)
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items())[:2])
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print('RuntimeError:', error)
+
+    print("\nenable_shrink example")
+    print("---------------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_shrink(0.125, 11)
+    for i in range(200):
+        m.put('str' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    for i in range(195):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get('str199'))
+
+    print("\nenable_flood_protection example")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_flood_protection(4)
+    words = ['abcdef', 'bacdef', 'cabdef', 'dabcef', 'eabcdf', 'fabcde', 'abcdfe', 'abcedf']
+    for i, word in enumerate(words):
+        m.put(word, i)
+    print(m.stats()['reseeds'] > 0, m.get_size(), [m.get(word) for word in words] == list(range(len(words))))
+
+    print("\nenable_adaptive_hashing example")
+    print("-------------------------------")
+    # Anagrams all have the same hash_function_1 hash, so another function is chosen once enough keys are sampled
+    m = HashMap(11, hash_function_1)
+    m.enable_adaptive_hashing(sample_size=100)
+    words = [''.join(letters) for letters in itertools.permutations('abcdef')]
+    for i, word in enumerate(words):
+        m.put(word, i)
+    print(m._hash_function.__name__ != 'hash_function_1', m.stats()['hash_switches'] > 0, m.get('fedcba'),
+          m.get_size())
+
+    print("\nenable_bloom_filter example")
+    print("---------------------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_bloom_filter()
+    for i in range(100):
+        m.put('str' + str(i), i)
+    print(m.get('str7'), m.contains_key('str99'), sum(m.contains_key('missing' + str(i)) for i in range(100)) < 10)
+
+    print("\nsnapshot / restore example")
+    print("--------------------------")
+    import os
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'map.snapshot')
+    m = HashMap(11, hash_function_1)
+    for i in range(50):
+        m.put('str' + str(i), i * 10)
+    m.remove('str0')
+    m.snapshot(path)
+    restored = HashMap.restore(path)
+    print(restored.get_size(), restored.get_capacity(), restored.get('str49'), restored.get('str0'),
+          restored.stats()['tombstones'])
+    os.remove(path)
@@ -0,0 +1,95 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements a compact Hash Map using open addressing with a power of two capacity.
+#
+#              Every index is computed with a bit mask instead of the modulo operator, and collisions are resolved
+#              with triangular probing: the n-th probe moves n buckets past the previous one, so the probe sequence
+#              visits offsets 0, 1, 3, 6, 10, ... from the home bucket. With a power of two capacity these offsets
+#              reach every bucket of the table, so a put always finds an open bucket.
+#
+#              Masking keeps only the low bits of a hash, so this map should be used with a hash function that mixes
+#              every input bit into its low bits, such as hash_functions.hash_function_fnv1a or hash_function_murmur.
+#
+#              PowerOfTwoHashMap has the same public methods, resize rules and iterator as
+#              hash_map_compact.CompactHashMap, except that capacities are rounded up to a power of two instead of
+#              a prime number.
+
+from a6_include import hash_function_1
+from hash_functions import hash_function_fnv1a
+from hash_map_compact import CompactHashMap
+
+
+class PowerOfTwoHashMap(CompactHashMap):
+    # Triangular probing places entries differently, so snapshots of the prime capacity maps cannot be restored here
+    _SNAPSHOT_KIND = 'pow2'
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new compact HashMap that uses a power of two capacity and
+        triangular probing for collision resolution
+        """
+        # capacity must be a power of two
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+        self._init_state()
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Returns the capacity resize_table uses for a proposed capacity. It must be a power of two of at least 4, so
+        any other capacity is changed to the next power of two. Smaller tables could fill up before growing.
+        """
+        return 1 << max(capacity - 1, 3).bit_length()
+
+    def _grown_capacity(self) -> int:
+        """
+        Returns the capacity the table grows to once a new key would make it more than half full, twice the current one
+        """
+        return 2 * self._capacity
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the capacity needed to add count more keys without the load factor passing 0.5, or 0 if the current
+        capacity is already enough.
+        """
+        if (self._size + count) / self._capacity > 0.5:
+            return 2 * (self._size + count) + 1
+        return 0
+
+    def _home(self, hash_value: int) -> int:
+        """
+        Returns the first bucket of the probe sequence of hash_value, taken from its low bits
+        """
+        return hash_value & (self._capacity - 1)
+
+    def _next(self, index_initial: int, probe: int) -> int:
+        """
+        Returns the bucket visited after probe buckets of the probe sequence starting at index_initial
+        """
+        # Determine next index using triangular probing scheme: the n-th probe is n buckets past the previous one
+        return (index_initial + probe * (probe + 1) // 2) & (self._capacity - 1)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove example")
+    print("--------------------------")
+    m = PowerOfTwoHashMap(50, hash_function_fnv1a)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    m.put('str0', 'overwritten')
+    m.remove('str1')
+    print(m.get('str0'), m.get('str1'), m.contains_key('str2'), m.get_size(), m.stats()['tombstones'])
+
+    print("\nevery bucket is reachable")
+    print("-------------------------")
+    m = PowerOfTwoHashMap(16, hash_function_1)
+    capacity = m.get_capacity()
+    print(capacity, len({(probe * (probe + 1) // 2) % capacity for probe in range(capacity)}))
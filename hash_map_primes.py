@@ -0,0 +1,93 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Prime capacities for the HashMaps without trial division.
+#
+#              Growing a map doubles its capacity and rounds up to the next prime. PRIME_LADDER holds that sequence,
+#              precomputed from the default capacity of 11, so growing a map whose capacity is on the ladder is a
+#              single dictionary lookup. Capacities off the ladder are rounded with a Miller-Rabin primality test, and
+#              the rung found is remembered so the next map growing from the same capacity jumps straight to it.
+#
+#              Every function returns the same capacity as HashMap._next_prime and HashMap._is_prime, so resizing gives
+#              the same tables as before, only faster.
+#
+#              It includes the following public functions:
+#
+#              is_prime(capacity) - Returns True if capacity is prime. Deterministic below
+#                                   318665857834031151167461, about 3.18 * 10 ** 23
+#              next_prime(capacity) - Returns the same prime as HashMap._next_prime(capacity)
+#              grown_capacity(capacity) - Returns next_prime(2 * capacity), the capacity a map grows to
+
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Maps each rung of the ladder to the next one
+_NEXT_RUNG = {}
+
+
+def is_prime(capacity: int) -> bool:
+    """
+    Returns True if capacity is a prime number, using the Miller-Rabin test with the first twelve primes as bases,
+    which is exact for every capacity below 318665857834031151167461, about 3.18 * 10 ** 23
+    """
+    if capacity < 2:
+        return False
+
+    # Small factors settle most composite numbers without any modular exponentiation
+    for prime in _SMALL_PRIMES:
+        if capacity % prime == 0:
+            return capacity == prime
+
+    # Write capacity - 1 as odd * 2 ** twos
+    odd, twos = capacity - 1, 0
+    while odd % 2 == 0:
+        odd //= 2
+        twos += 1
+
+    for base in _SMALL_PRIMES:
+        x = pow(base, odd, capacity)
+        if x == 1 or x == capacity - 1:
+            continue
+
+        for _ in range(twos - 1):
+            x = x * x % capacity
+            if x == capacity - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Returns the closest prime number at or above capacity, stepping over even numbers like HashMap._next_prime
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def grown_capacity(capacity: int) -> int:
+    """
+    Returns the capacity a map of the given capacity grows to, which is next_prime(2 * capacity)
+    """
+    rung = _NEXT_RUNG.get(capacity)
+    if rung is None:
+        rung = _NEXT_RUNG[capacity] = next_prime(2 * capacity)
+    return rung
+
+
+def _build_ladder(first: int, last: int) -> tuple:
+    """
+    Returns the primes reached by repeatedly growing a map of capacity first, up to last
+    """
+    ladder = [first]
+    while ladder[-1] < last:
+        ladder.append(grown_capacity(ladder[-1]))
+    return tuple(ladder)
+
+
+PRIME_LADDER = _build_ladder(11, 2 ** 48)
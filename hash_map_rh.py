@@ -0,0 +1,207 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements a Hash Map using open addressing with Robin Hood linear probing for collision
+#              resolution.
+#
+#              On insert, an entry that has travelled further from its home bucket takes the place of a "richer"
+#              entry that is closer to its own home bucket, which keeps probe lengths short and even. Because entries
+#              along a probe sequence are ordered by distance, a lookup stops as soon as it reaches an entry closer
+#              to home than the key being searched for, so unsuccessful lookups end early. Removal shifts the
+#              following entries back one bucket instead of leaving a tombstone.
+#
+#              RobinHoodHashMap has the same public methods and iterator as hash_map_oa.HashMap and uses the same
+#              flat array storage as hash_map_compact.CompactHashMap.
+
+from a6_include import hash_function_1, hash_function_2
+from hash_map_compact import _EMPTY, _LIVE, _HASH_MASK, CompactHashMap
+
+
+class RobinHoodHashMap(CompactHashMap):
+    # Linear probing places entries differently, so snapshots of the quadratic probing maps cannot be restored here
+    _SNAPSHOT_KIND = 'rh'
+
+    def _find(self, key: str, hash_value: int, operation: str) -> int:
+        """
+        Returns the index of the bucket holding key, or -1 if the key does not exist in the hash map.
+        operation names the calling method in the recorded statistics.
+        """
+        hashes, keys, states, capacity = self._hashes, self._keys, self._states, self._capacity
+        index = hash_value % capacity
+        distance = 0
+
+        # Stop at an empty bucket or at an entry closer to its home bucket than the key would be
+        while states[index] == _LIVE:
+            if hashes[index] == hash_value and keys[index] == key:
+                break
+
+            if (index - hashes[index]) % capacity < distance:
+                index = -1
+                break
+
+            index = (index + 1) % capacity
+            distance += 1
+        else:
+            index = -1
+
+        if self._stats is not None:
+            self._stats.record(operation, distance + 1)
+        return index
+
+    # ------------------------------------------------------------------ #
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Updates the key/value pair in the hash map using an already computed hash of the key. A new entry displaces
+        any entry on its probe path that is closer to its home bucket.
+        """
+        self._place(key, lambda _: value, None, hash_value, 'put')
+
+    def _upsert_hashed(self, key: str, fn: callable, default: object, hash_value: int) -> object:
+        """
+        Implements upsert using an already computed hash of the key, walking the probe sequence once
+        """
+        return self._place(key, fn, default, hash_value, 'upsert')
+
+    def _place(self, key: str, fn: callable, default: object, hash_value: int, operation: str) -> object:
+        """
+        Replaces the value of key by fn(value), or adds key with the value fn(default), in one walk of its probe
+        sequence, and returns the new value. operation names the calling method in the recorded statistics.
+        """
+        hash_value = self._before_put(key, hash_value & _HASH_MASK)
+
+        hashes, keys, values, states, capacity = self._hashes, self._keys, self._values, self._states, self._capacity
+        index = hash_value % capacity
+        distance = 0
+        probe = 1
+
+        # Entries are ordered by distance, so the key can only be found before the first richer entry
+        while states[index] == _LIVE:
+
+            # Matching key: replace the value in place
+            if hashes[index] == hash_value and keys[index] == key:
+                value = values[index] = fn(values[index])
+
+                if self._stats is not None:
+                    self._stats.record(operation, probe)
+                return value
+
+            if (index - hashes[index]) % capacity < distance:
+                break
+
+            index = (index + 1) % capacity
+            distance += 1
+            probe += 1
+
+        # The key is new. Take the bucket from each richer entry and carry that entry forward instead
+        result = value = fn(default)
+        while states[index] == _LIVE:
+            resident_distance = (index - hashes[index]) % capacity
+            if resident_distance < distance:
+                hashes[index], hash_value = hash_value, hashes[index]
+                keys[index], key = key, keys[index]
+                values[index], value = value, values[index]
+                distance = resident_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+            probe += 1
+
+        hashes[index] = hash_value
+        keys[index] = key
+        values[index] = value
+        states[index] = _LIVE
+        self._size += 1
+        self._modifications += 1
+
+        if self._stats is not None:
+            self._stats.record(operation, probe)
+            self._stats.record_insert(probe > 1)
+
+        # Rehash with a seeded hash function if the probe sequence is abnormally long
+        if self._flood_limit and probe > self._flood_limit:
+            self._reseed()
+        return result
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map, shifting the following entries of the probe
+        sequence back one bucket. If the key is not in the hash map, the method does nothing.
+        """
+        index = self._find(key, self._hash_function(key) & _HASH_MASK, 'remove')
+        if index < 0:
+            return
+
+        hashes, keys, values, states, capacity = self._hashes, self._keys, self._values, self._states, self._capacity
+        next_index = (index + 1) % capacity
+
+        # Shift entries back until reaching an empty bucket or an entry already in its home bucket
+        while states[next_index] == _LIVE and (next_index - hashes[next_index]) % capacity > 0:
+            hashes[index] = hashes[next_index]
+            keys[index] = keys[next_index]
+            values[index] = values[next_index]
+            index = next_index
+            next_index = (next_index + 1) % capacity
+
+        hashes[index] = 0
+        keys[index] = None
+        values[index] = None
+        states[index] = _EMPTY
+        self._size -= 1
+        self._modifications += 1
+
+        # Shrink the table if the load factor dropped below the low-water mark
+        capacity = self._shrink_capacity()
+        if capacity:
+            self.resize_table(capacity)
+
+    def max_probe_length(self) -> int:
+        """
+        Returns the largest distance of any entry from its home bucket
+        """
+        longest = 0
+        for index in range(self._capacity):
+            if self._states[index] == _LIVE:
+                longest = max(longest, (index - self._hashes[index]) % self._capacity)
+        return longest
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove example")
+    print("--------------------------")
+    m = RobinHoodHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity(), m.max_probe_length())
+    m.put('str0', 'overwritten')
+    m.remove('str1')
+    print(m.get('str0'), m.get('str1'), m.contains_key('str2'), m.get_size(), m.stats()['tombstones'])
+
+    print("\ncontains_key example")
+    print("--------------------")
+    m = RobinHoodHashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\n__iter__(), __next__() example")
+    print("------------------------------")
+    m = RobinHoodHashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
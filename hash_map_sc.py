@@ -5,6 +5,11 @@
 # Due Date: 3/14/2024
 # Description: This module implements a Hash Map using chaining for collision resolution.
 #
+#              A chain longer than TREEIFY_THRESHOLD nodes is converted to a SortedBucket, which keeps its nodes
+#              sorted by (hash, key) and finds them by binary search, so keys that all collide (for example anagrams
+#              under hash_function_1) cost logarithmic rather than linear time. A SortedBucket shorter than
+#              UNTREEIFY_THRESHOLD nodes is converted back to a LinkedList.
+#
 #              It includes the following public methods:
 #
 #              get_size() - Returns the number of elements in the hash map
@@ -17,29 +22,160 @@
 #              get(key) - Returns the value associated with the given key if the key exists in the hash map
 #              contains_key(key) - Returns True if the given key exists in the hash map. False, if not.
 #              remove(key) - Removes the value associated with the given key from the hash map
+#              upsert(key, fn, default) - Replaces the value of key with fn(value), or adds key with fn(default)
+#              setdefault(key, default) - Returns the value of key, adding key with default first if it is missing
+#              increment(key, delta) - Adds delta to the value of key, treating a missing key as 0
+#              enable_stats() / disable_stats() - Starts or stops recording chain lengths, resizes and collisions
+#              stats() - Returns a dictionary describing the hash table and, if enabled, the recorded statistics
+#              enable_shrink(low_water, min_capacity) / disable_shrink() - Starts or stops shrinking the table in
+#                                                                         remove once the load factor is below low_water
+#              enable_flood_protection(max_chain) / disable_flood_protection() - Starts or stops replacing the hash
+#                  function by a randomly seeded SipHash function, and rehashing, once a chain grows past max_chain
+#              enable_adaptive_hashing(sample_size, functions) / disable_adaptive_hashing() - Starts or stops choosing
+#                  the hash function again at every resize, from its spread over a sample of the keys
+#              enable_bloom_filter(bits_per_key) / disable_bloom_filter() - Starts or stops rejecting most missing keys
+#                  in get and contains_key with a Bloom filter, before reading any bucket
+#              put_many(pairs, size_hint) - Updates or adds many key/value pairs, resizing the table at most once
+#              get_many(keys) - Returns a dynamic array with the value associated with each of the given keys
+#              remove_many(keys) - Removes each of the given keys from the hash map
+#              snapshot(path) - Writes the bucket layout and every entry to a binary file
+#              restore(path) - Class method returning a HashMap rebuilt from a snapshot without hashing any key
 #              get_keys_and_values() - Returns a dynamic array where each index contains a tuple of each key/value pair
 #                                      stored in the hash map.
+#              keys(), values(), items() - Return independent iterators over the keys, values or (key, value) tuples
+#                                          of the hash map. They raise RuntimeError if the map gains or loses keys
+#                                          during iteration.
 #              clear() - Clears the contents of the hash map. It does not change the underlying hash table capacity
 #
 #
-#              This module includes the following public function:
+#              This module includes the following public classes:
+#
+#              IncrementalHashMap(capacity, function, migrate_per_operation) - HashMap with the same public methods
+#                  that spreads each resize over later operations instead of rebuilding the table in one step.
+#                  is_resizing() returns True while old buckets are still being migrated.
+#              ModeCounter(capacity, function) - Counts elements one at a time. add(element), update(elements),
+#                  count(element), mode() and top_k(k) return counts and modes without holding the input in memory.
+#
+#
+#              This module includes the following public functions:
 #
 #              find_mode(da) - Returns a tuple containing a dynamic array comprising the mode value(s) of the given
 #                              array, and an integer representing the highest frequency of occurrence for the mode
 #                              value(s).
-
-from a6_include import (DynamicArray, LinkedList,
+#              find_mode_stream(elements, function) - Returns the same result as find_mode for any iterable or
+#                                                     generator, reading it once
+#              find_mode_parallel(elements, workers, function, chunk_size) - Returns the same result as find_mode,
+#                                                                            counting hash-partitioned chunks of the
+#                                                                            input in worker processes as it is read
+
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import time
+from bisect import bisect_left
+from array import array
+
+from a6_include import (DynamicArray, HashMapIterator, LinkedList, SLNode,
                         hash_function_1, hash_function_2)
+from hash_functions import make_siphash_function, select_hash_function
+from hash_map_bloom import BloomFilter
+from hash_map_methods import MapMethods
+from hash_map_primes import grown_capacity, is_prime, next_prime
+from hash_map_snapshot import array_from_bytes, array_to_bytes, read_snapshot, write_snapshot
+from hash_map_stats import MapStats
+
+
+class SortedBucket:
+    """
+    Bucket keeping its nodes sorted by (hash, key), used in place of a LinkedList for long chains.
+    Supported methods are the same as LinkedList: insert, remove, contains, length, iterator
+    """
+
+    def __init__(self, nodes=()) -> None:
+        """
+        Initialize new bucket holding copies of the given nodes, which must all have a cached hash
+        """
+        self._nodes = [SLNode(node.key, node.value, None, node.hash_value) for node in nodes]
+        self._nodes.sort(key=lambda node: (node.hash_value, node.key))
+        self._order = [(node.hash_value, node.key) for node in self._nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SB [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in (hash, key) order."""
+        return iter(self._nodes)
+
+    def _position(self, key: str, hash_value: int) -> int:
+        """
+        Return the index of the node with matching key, or -1 if no match.
+        Without a hash_value the nodes are scanned in order.
+        """
+        if hash_value is None:
+            for position, node in enumerate(self._nodes):
+                if node.key == key:
+                    return position
+            return -1
+
+        position = bisect_left(self._order, (hash_value, key))
+        if position < len(self._order) and self._order[position] == (hash_value, key):
+            return position
+        return -1
+
+    def insert(self, key: str, value: object, hash_value: int = None) -> None:
+        """Insert new node at its sorted position, caching the key's hash."""
+        position = bisect_left(self._order, (hash_value, key))
+        self._order.insert(position, (hash_value, key))
+        self._nodes.insert(position, SLNode(key, value, None, hash_value))
+
+    def remove(self, key: str, hash_value: int = None) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        position = self._position(key, hash_value)
+        if position < 0:
+            return False
+
+        del self._order[position]
+        del self._nodes[position]
+        return True
+
+    def contains(self, key: str, hash_value: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        """
+        position = self._position(key, hash_value)
+        if position < 0:
+            return None
+        return self._nodes[position]
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
 
 
-class HashMap:
+class HashMap(MapMethods):
+    # Chain length above which a bucket becomes a SortedBucket, and below which it becomes a LinkedList again
+    TREEIFY_THRESHOLD = 8
+    UNTREEIFY_THRESHOLD = 6
+
+    # Maps with fewer keys keep their hash function, because a sample that small says little about the spread
+    ADAPTIVE_MIN_KEYS = 100
+
+    # Opt-in settings given to the empty copies made by _empty_copy()
+    _COPIED_STATE = ('_shrink_load', '_min_capacity', '_flood_limit', '_reseeds', '_adaptive_sample',
+                     '_adaptive_functions', '_hash_switches')
+
     def __init__(self,
                  capacity: int = 11,
                  function: callable = hash_function_1) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         self._buckets = DynamicArray()
 
@@ -51,6 +187,31 @@ class HashMap:
         self._hash_function = function
         self._size = 0
 
+        # Number of times keys were added or removed or the table was rebuilt. Iterators compare it to detect changes
+        self._modifications = 0
+
+        # MapStats collecting operation statistics, or None while statistics are disabled. See enable_stats()
+        self._stats = None
+
+        # Load factor below which remove shrinks the table, or 0 while shrinking is disabled. See enable_shrink()
+        self._shrink_load = 0.0
+        self._min_capacity = 11
+
+        # Chain length that triggers a rehash with a seeded hash function, or 0 while disabled, and the number of
+        # such rehashes. See enable_flood_protection()
+        self._flood_limit = 0
+        self._reseeds = 0
+
+        # Number of keys sampled at each resize to choose the hash function, or 0 while disabled, the candidate
+        # functions (None for all of HASH_FUNCTIONS) and the number of times the function was changed.
+        # See enable_adaptive_hashing()
+        self._adaptive_sample = 0
+        self._adaptive_functions = None
+        self._hash_switches = 0
+
+        # BloomFilter holding the hash of every key, or None while disabled. See enable_bloom_filter()
+        self._bloom = None
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -122,20 +283,54 @@ class HashMap:
         Returns:
             None - key/value pair will be updated or added to the hash map
         """
-        # Check the load factor and resize the table if greater than or equal to 1
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Updates the key/value pair in the hash map using an already computed hash of the key.
+        Used by put and resize_table so that keys are never hashed more than once.
+        """
+        hash_value = self._before_put(key, hash_value)
 
         # Determine the index for the given key
-        hash_value = self._hash_function(key)
         index = hash_value % self._capacity
 
-        # At the bucket pointed to by index, use the Linked List remove method to remove a node with the input key if
-        # it already exists in the bucket. Then, use the Linked List insert method to add the new key-value pair.
-        if self._buckets[index].remove(key):
-            self._size -= 1
-        self._buckets[index].insert(key, value)
-        self._size += 1
+        # At the bucket pointed to by index, use the Linked List contains method to find a node with the input key.
+        # Replace its value in place if it exists, otherwise use the Linked List insert method to add a new node.
+        node = self._buckets[index].contains(key, hash_value)
+        existed = node is not None
+        if existed:
+            node.value = value
+        else:
+            self._buckets[index].insert(key, value, hash_value)
+            self._size += 1
+            self._modifications += 1
+            self._check_chain(index)
+
+        if self._stats is not None:
+            self._record_put(self._buckets[index], existed)
+
+        # Rehash with a seeded hash function if the chain is abnormally long
+        if self._flood_limit and self._buckets[index].length() > self._flood_limit:
+            self._reseed()
+
+    def _before_put(self, key: str, hash_value: int) -> int:
+        """
+        Prepares the table for a put or upsert of key and returns the hash to store key with. The Bloom filter, if
+        enabled, is given that hash.
+        """
+        # Check the load factor and resize the table if greater than or equal to 1
+        function = self._hash_function
+        if self.table_load() >= 1:
+            self.resize_table(grown_capacity(self._capacity))
+
+        # Adaptive hashing may have replaced the hash function while resizing, in which case the key is hashed again
+        if self._hash_function is not function:
+            hash_value = self._hash_function(key)
+
+        if self._bloom is not None:
+            self._bloom.add(hash_value)
+        return hash_value
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -155,17 +350,38 @@ class HashMap:
             return
 
         # new_capacity must be prime. If it is not prime, change it to the next prime number
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
-
-        # Store the keys and values of each element in the table. Update self._capacity and clear the hash table
-        da = self.get_keys_and_values()
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        # In adaptive mode, rehash every key if another hash function suits the current keys better
+        if self._adaptive_sample:
+            function = self._select_hash_function(new_capacity)
+            if function is not self._hash_function:
+                self._rehash_with(function, new_capacity)
+                return
+
+        # Puts made while rehashing are part of the resize, so they are not recorded as operations and cannot
+        # trigger a rehash with another hash function
+        stats, self._stats = self._stats, None
+        flood_limit, self._flood_limit = self._flood_limit, 0
+        adaptive_sample, self._adaptive_sample = self._adaptive_sample, 0
+        start = time.perf_counter()
+
+        # Store the nodes of each element in the table. Update self._capacity and clear the hash table
+        da = self._get_nodes()
         self._capacity = new_capacity
         self.clear()
 
-        # Loop through the keys & values and add them to the new hash table
+        # Loop through the nodes and add them to the new hash table using their cached hash values
         for index in range(da.length()):
-            self.put(da[index][0], da[index][1])
+            node = da[index]
+            self._put_hashed(node.key, node.value, node.hash_value)
+
+        self._stats = stats
+        self._flood_limit = flood_limit
+        self._adaptive_sample = adaptive_sample
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
 
     def table_load(self) -> float:
         """
@@ -201,13 +417,23 @@ class HashMap:
         hash_value = self._hash_function(key)
         index = hash_value % self._capacity
 
+        # Most missing keys are rejected by the Bloom filter without reading the bucket
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return None
+
+        if self._stats is not None:
+            self._stats.record('get', self._buckets[index].length())
+
         # At the bucket pointed to by index, use the LinkedList contains method to return the node with the input key
-        node = self._buckets[index].contains(key)
+        node = self._buckets[index].contains(key, hash_value)
 
         # If the node is not None, return the node's value
         if node:
             return node.value
 
+        if self._bloom is not None:
+            self._bloom.record_false_positive()
+
     def contains_key(self, key: str) -> bool:
         """
         Returns True if the given key is in the hash map, otherwise it returns False.
@@ -223,11 +449,20 @@ class HashMap:
         hash_value = self._hash_function(key)
         index = hash_value % self._capacity
 
+        # Most missing keys are rejected by the Bloom filter without reading the bucket
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return False
+
+        if self._stats is not None:
+            self._stats.record('contains_key', self._buckets[index].length())
+
         # At the bucket pointed to by index, use the LinkedList contains method to determine if the key exists
-        if self._buckets[index].contains(key):
+        if self._buckets[index].contains(key, hash_value):
             return True
 
         # Return False if the key is not found
+        if self._bloom is not None:
+            self._bloom.record_false_positive()
         return False
 
     def remove(self, key: str) -> None:
@@ -245,9 +480,304 @@ class HashMap:
         hash_value = self._hash_function(key)
         index = hash_value % self._capacity
 
+        if self._stats is not None:
+            self._stats.record('remove', self._buckets[index].length())
+
         # At the bucket pointed to by index, use the LinkedList remove method to remove the key if it exists
-        if self._buckets[index].remove(key):
+        if self._buckets[index].remove(key, hash_value):
             self._size -= 1
+            self._modifications += 1
+            self._check_chain(index)
+
+            # Shrink the table if the load factor dropped below the low-water mark
+            capacity = self._shrink_capacity()
+            if capacity:
+                self.resize_table(capacity)
+
+    def upsert(self, key: str, fn: callable, default: object = None) -> object:
+        """
+        Replaces the value associated with the given key by fn(value), or adds the key with the value fn(default) if
+        it is not in the hash map. The key is hashed and its bucket searched only once, and an existing node is
+        updated in place.
+
+        Args:
+            key: str - the key to update or add
+            fn: callable - called with the current value, or with default for a new key, and returns the new value
+            default: object - the value passed to fn when the key is not in the hash map
+
+        Returns:
+            value: object - the new value associated with the key
+        """
+        return self._upsert_hashed(key, fn, default, self._hash_function(key))
+
+    def _upsert_hashed(self, key: str, fn: callable, default: object, hash_value: int) -> object:
+        """
+        Implements upsert using an already computed hash of the key.
+        """
+        hash_value = self._before_put(key, hash_value)
+
+        index = hash_value % self._capacity
+        bucket = self._buckets[index]
+        node = bucket.contains(key, hash_value)
+        existed = node is not None
+        if existed:
+            value = node.value = fn(node.value)
+        else:
+            value = fn(default)
+            bucket.insert(key, value, hash_value)
+            self._size += 1
+            self._modifications += 1
+            self._check_chain(index)
+
+        if self._stats is not None:
+            self._record_put(self._buckets[index], existed, 'upsert')
+
+        # Rehash with a seeded hash function if the chain is abnormally long
+        if self._flood_limit and self._buckets[index].length() > self._flood_limit:
+            self._reseed()
+        return value
+
+    def _check_chain(self, index: int) -> None:
+        """
+        Converts the bucket at index to a SortedBucket once its chain is longer than TREEIFY_THRESHOLD, and back to a
+        LinkedList once it is shorter than UNTREEIFY_THRESHOLD.
+        """
+        bucket = self._buckets[index]
+
+        if type(bucket) is LinkedList:
+            if bucket.length() > self.TREEIFY_THRESHOLD:
+                self._buckets[index] = SortedBucket(bucket)
+
+        elif bucket.length() < self.UNTREEIFY_THRESHOLD:
+            # insert adds at the head, so the nodes are inserted in reverse to keep their order
+            linked_list = LinkedList()
+            for node in reversed(list(bucket)):
+                linked_list.insert(node.key, node.value, node.hash_value)
+            self._buckets[index] = linked_list
+
+    def _reseed(self) -> None:
+        """
+        Replaces the hash function by a SipHash function with a random seed of its own and rehashes every key into a
+        table of the same capacity. A map whose hash function is already seeded is left unchanged.
+        """
+        if getattr(self._hash_function, 'seed', None) is not None:
+            return
+
+        self._reseeds += 1
+        self._rehash_with(make_siphash_function(), self._capacity)
+
+    def _select_hash_function(self, capacity: int) -> callable:
+        """
+        Returns the hash function adaptive hashing chooses for a table of the given capacity, measured on a sample of
+        the keys spread at the same load factor. A seeded function set by flood protection is always kept.
+        """
+        if getattr(self._hash_function, 'seed', None) is not None or self._size < self.ADAPTIVE_MIN_KEYS:
+            return self._hash_function
+
+        # Take every step-th key, so the sample is spread over the whole table
+        step = max(1, self._size // self._adaptive_sample)
+        sample = [key for key, _, _ in itertools.islice(self._entries(), 0, None, step)]
+        sample_capacity = max(1, round(len(sample) * capacity / self._size))
+
+        return select_hash_function(sample, sample_capacity, self._adaptive_functions, self._hash_function)
+
+    def _rehash_with(self, function: callable, capacity: int) -> None:
+        """
+        Replaces the hash function by function and rehashes every key into a table of the given capacity
+        """
+        stats, self._stats = self._stats, None
+        flood_limit, self._flood_limit = self._flood_limit, 0
+        adaptive_sample, self._adaptive_sample = self._adaptive_sample, 0
+        start = time.perf_counter()
+
+        nodes = self._get_nodes()
+        if function is not self._hash_function:
+            self._hash_function = function
+            self._hash_switches += 1
+        self._capacity = capacity
+        self.clear()
+
+        for index in range(nodes.length()):
+            node = nodes[index]
+            self._put_hashed(node.key, node.value, function(node.key))
+
+        self._stats = stats
+        self._flood_limit = flood_limit
+        self._adaptive_sample = adaptive_sample
+        if stats is not None:
+            stats.record_resize(time.perf_counter() - start)
+
+    def _record_put(self, bucket: LinkedList, existed: bool, operation: str = 'put') -> None:
+        """
+        Records a put that just placed a key in bucket. existed is True if the key replaced an existing node.
+        operation names the calling method in the recorded statistics.
+        """
+        chain_length = bucket.length() if existed else bucket.length() - 1
+        self._stats.record(operation, chain_length)
+        if not existed:
+            self._stats.record_insert(chain_length > 0)
+
+    def enable_stats(self) -> None:
+        """
+        Starts recording chain lengths, resizes and collisions for every operation. See stats()
+        """
+        if self._stats is None:
+            self._stats = MapStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording operation statistics and discards those recorded so far
+        """
+        self._stats = None
+
+    def enable_shrink(self, low_water: float = 0.25, min_capacity: int = 11) -> None:
+        """
+        Makes remove shrink the table when the load factor drops below low_water. The table shrinks to a load factor
+        of twice low_water, so a map must lose or gain a large share of its keys before it resizes again.
+
+        Args:
+            low_water: float - load factor below which the table shrinks. Must be above 0 and below 0.5
+            min_capacity: int - the table never shrinks below this capacity
+        """
+        if not 0 < low_water < 0.5:
+            raise ValueError("low_water must be above 0 and below 0.5")
+
+        self._shrink_load = low_water
+        self._min_capacity = min_capacity
+
+    def disable_shrink(self) -> None:
+        """
+        Stops remove from shrinking the table
+        """
+        self._shrink_load = 0.0
+
+    def enable_flood_protection(self, max_chain: int = 32) -> None:
+        """
+        Makes put and upsert watch the length of the chain they add to. Once a chain is longer than max_chain, which
+        does not happen by chance with a good hash function, the hash function is replaced by a SipHash function with
+        a random seed of its own and every key is rehashed. Keys chosen to collide (for example anagrams under
+        hash_function_1) are spread out again, and cannot be predicted to collide under the new seed.
+
+        Args:
+            max_chain: int - longest chain accepted before rehashing
+        """
+        self._flood_limit = max(1, max_chain)
+
+    def disable_flood_protection(self) -> None:
+        """
+        Stops watching chain lengths. A hash function already replaced is kept.
+        """
+        self._flood_limit = 0
+
+    def enable_adaptive_hashing(self, sample_size: int = 1000, functions: dict = None) -> None:
+        """
+        Makes resize_table choose the hash function again each time the table is resized. Up to sample_size keys are
+        hashed by each candidate into a table with the load factor of the resized one. The current function is kept
+        while it spreads them about as evenly as a random function, and otherwise the function spreading them most
+        evenly is used (see hash_functions.select_hash_function). If it is not the current function, every key is
+        rehashed with it instead of reusing its cached hash.
+
+        A hash function set by flood protection is never replaced. IncrementalHashMap only chooses again when
+        resize_table is called directly, not when it grows incrementally.
+
+        Args:
+            sample_size: int - most keys measured at each resize
+            functions: dict - candidate hash functions by name. Defaults to every function in HASH_FUNCTIONS
+        """
+        self._adaptive_sample = max(1, sample_size)
+        self._adaptive_functions = functions
+
+    def disable_adaptive_hashing(self) -> None:
+        """
+        Stops choosing the hash function at resize. The function in use is kept.
+        """
+        self._adaptive_sample = 0
+
+    def enable_bloom_filter(self, bits_per_key: int = 10) -> None:
+        """
+        Puts a Bloom filter in front of get and contains_key. The filter holds the hash of every key put into the map,
+        so a key whose hash it does not hold is reported missing without reading its bucket. Put and upsert pay for
+        setting the bits of the key. The filter is rebuilt with the table by resize_table and clear, and its
+        false positive rate is reported by stats().
+
+        IncrementalHashMap fills a new filter as keys migrate during an incremental resize, and consults the previous
+        filter for keys that have not migrated yet.
+
+        Args:
+            bits_per_key: int - bits of the filter per key the table holds before growing. 10 bits give about 1%
+                                false positives
+        """
+        self._bloom = BloomFilter(self._capacity, bits_per_key)
+        for _, _, hash_value in self._entries():
+            self._bloom.add(hash_value)
+
+    def disable_bloom_filter(self) -> None:
+        """
+        Removes the Bloom filter and its statistics
+        """
+        self._bloom = None
+
+    def stats(self) -> dict:
+        """
+        Returns a dictionary describing the hash table and, if enabled, the operations made on it.
+
+        Returns:
+            stats: dict - capacity, size, empty (buckets), load, max_chain, reseeds (rehashes made by flood
+                          protection) and hash_switches (hash functions replaced by flood protection or adaptive
+                          hashing). While the Bloom filter is enabled, bloom holds its BloomFilter report. While
+                          statistics are enabled it also contains the MapStats report: chain length
+                          histogram, average and max chain length per operation, resize count and time, and the share
+                          of inserts that collided.
+        """
+        max_chain = 0
+        for index in range(self._capacity):
+            if self._buckets[index] is not None:
+                max_chain = max(max_chain, self._buckets[index].length())
+
+        stats = {
+            'capacity': self._capacity,
+            'size': self._size,
+            'empty': self.empty_buckets(),
+            'load': self.table_load(),
+            'max_chain': max_chain,
+            'reseeds': self._reseeds,
+            'hash_switches': self._hash_switches,
+        }
+        if self._bloom is not None:
+            stats['bloom'] = self._bloom.report()
+        if self._stats is not None:
+            stats.update(self._stats.report())
+        return stats
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the capacity needed to add count more keys without the load factor reaching 1, or 0 if the current
+        capacity is already enough.
+        """
+        if self._size + count > self._capacity:
+            return self._size + count
+        return 0
+
+    def _shrink_capacity(self) -> int:
+        """
+        Returns the capacity to shrink the table to, or 0 if shrinking is disabled or the load factor is not below the
+        low-water mark. Only capacities at most half the current one are returned, so a shrink always frees memory.
+        """
+        if self._size >= self._shrink_load * self._capacity:
+            return 0
+
+        capacity = max(self._min_capacity, int(self._size / (2 * self._shrink_load)) + 1)
+        if capacity > self._capacity // 2:
+            return 0
+        return capacity
+
+    def _reserve(self, count: int) -> None:
+        """
+        Resizes the table once so that count more keys can be added without the load factor reaching 1.
+        """
+        capacity = self._capacity_for(count)
+        if capacity:
+            self.resize_table(capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -267,6 +797,137 @@ class HashMap:
 
         return da
 
+    def _get_nodes(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing every node stored in the hash map, in bucket order.
+        """
+        da = DynamicArray()
+
+        for index in range(self._capacity):
+            for node in self._buckets[index]:
+                da.append(node)
+
+        return da
+
+    def _entries(self):
+        """
+        Yields (key, value, hash_value) for every key/value pair stored in the hash map, one bucket at a time,
+        without building a dynamic array.
+        """
+        for index in range(self._capacity):
+            for node in self._buckets[index]:
+                yield node.key, node.value, node.hash_value
+
+    def _empty_copy(self, capacity: int) -> "HashMap":
+        """
+        Returns an empty map of the same class and hash function with the given capacity and the opt-in settings of
+        this map. Statistics are not copied. An enabled Bloom filter is replaced by an empty one for the new capacity.
+        """
+        hash_map = type(self)(capacity, self._hash_function)
+        for name in self._COPIED_STATE:
+            setattr(hash_map, name, getattr(self, name))
+
+        # clear() sizes the new filter for the capacity of the map
+        if self._bloom is not None:
+            hash_map._bloom = self._bloom
+            hash_map.clear()
+        return hash_map
+
+    def _empty_copy_steps(self, capacity: int, chunk_size: int):
+        """
+        Generator building the same map as _empty_copy(capacity), chunk_size buckets at a time. It yields None after
+        each chunk and the new map last, so a coroutine can yield to the event loop between chunks.
+        """
+        hash_map = self._empty_copy(1)
+        capacity = self._next_prime(capacity)
+
+        buckets = DynamicArray()
+        append = buckets.append
+        while buckets.length() < capacity:
+            for _ in range(min(chunk_size, capacity - buckets.length())):
+                append(LinkedList())
+            yield None
+
+        hash_map._buckets = buckets
+        hash_map._capacity = capacity
+        if hash_map._bloom is not None:
+            hash_map._bloom = hash_map._bloom.cleared(capacity)
+        yield hash_map
+
+    def keys(self) -> HashMapIterator:
+        """
+        Returns an iterator over the keys of the hash map that reads the buckets as it goes, without copying them
+        """
+        return HashMapIterator(self, (key for key, _, _ in self._entries()))
+
+    def values(self) -> HashMapIterator:
+        """
+        Returns an iterator over the values of the hash map that reads the buckets as it goes, without copying them
+        """
+        return HashMapIterator(self, (value for _, value, _ in self._entries()))
+
+    def items(self) -> HashMapIterator:
+        """
+        Returns an iterator over (key, value) tuples of the hash map that reads the buckets as it goes, without
+        copying them
+        """
+        return HashMapIterator(self, ((key, value) for key, value, _ in self._entries()))
+
+    def snapshot(self, path: str) -> None:
+        """
+        Writes the capacity, hash function and chain layout of the hash map to a binary file, along with each key,
+        value and cached hash, so restore() can rebuild the same table without hashing.
+
+        Args:
+            path: str - file to create or overwrite. The hash function must be registered in HASH_FUNCTIONS.
+        """
+        counts = array('I')
+        hashes = array('Q')
+        keys = []
+        values = []
+
+        # Record the length of each chain, followed by its nodes from head to tail
+        for index in range(self._capacity):
+            bucket = self._buckets[index]
+            counts.append(bucket.length())
+            for node in bucket:
+                hashes.append(node.hash_value)
+                keys.append(node.key)
+                values.append(node.value)
+
+        write_snapshot(path, 'sc', self._capacity, self._hash_function, array_to_bytes(counts), hashes, keys,
+                       values)
+
+    @classmethod
+    def restore(cls, path: str) -> "HashMap":
+        """
+        Returns a new hash map with the exact chain layout stored by snapshot(). No key is hashed and no resize
+        takes place.
+
+        Args:
+            path: str - file written by snapshot()
+
+        Returns:
+            hash_map - the restored hash map
+        """
+        capacity, function, layout, hashes, keys, values = read_snapshot(path, 'sc')
+        counts = array_from_bytes('I', layout)
+
+        hash_map = cls(capacity, function)
+
+        position = 0
+        for index in range(capacity):
+            bucket = hash_map._buckets[index]
+
+            # insert adds at the head, so each chain is inserted from its tail to keep its order
+            for entry in range(position + counts[index] - 1, position - 1, -1):
+                bucket.insert(keys[entry], values[entry], hashes[entry])
+            position += counts[index]
+            hash_map._check_chain(index)
+
+        hash_map._size = position
+        return hash_map
+
     def clear(self) -> None:
         """
         Clears the contents of the hash map. It does not change the underlying hash table capacity.
@@ -279,6 +940,392 @@ class HashMap:
             self._buckets.append(LinkedList())
 
         self._size = 0
+        self._modifications += 1
+
+        # Keys are put back by resize_table, which rebuilds the Bloom filter for the new capacity
+        if self._bloom is not None:
+            self._bloom = self._bloom.cleared(self._capacity)
+
+
+class IncrementalHashMap(HashMap):
+    # The migration pace is an opt-in setting too
+    _COPIED_STATE = HashMap._COPIED_STATE + ('_migrate_per_operation',)
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 migrate_per_operation: int = 4) -> None:
+        """
+        Initialize new HashMap that uses separate chaining for collision resolution and grows incrementally.
+
+        When the load factor reaches 1, a new bucket array is allocated next to the old one instead of rebuilding the
+        table in one step. Every put, get, contains_key and remove then migrates migrate_per_operation old buckets into
+        the new array, so the cost of a resize is spread over many operations and no single put has to rehash the
+        whole map. Buckets of the new array are created lazily and are None until a key is placed in them.
+        """
+        super().__init__(capacity, function)
+        self._migrate_per_operation = max(1, migrate_per_operation)
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+    def is_resizing(self) -> bool:
+        """
+        Returns True while an incremental resize is in progress
+        """
+        return self._old_buckets is not None
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Keeps the current bucket array as the old table and allocates an empty bucket array of new_capacity.
+        """
+        if not is_prime(new_capacity):
+            new_capacity = next_prime(new_capacity)
+
+        start = time.perf_counter()
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._capacity = new_capacity
+        self._modifications += 1
+
+        # Keys are added to a new Bloom filter as they migrate. The current one answers for the keys left behind
+        if self._bloom is not None:
+            self._bloom = self._bloom.grown(new_capacity)
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _migrate(self, bucket_count: int) -> None:
+        """
+        Moves up to bucket_count buckets from the old table into the current bucket array.
+        """
+        if self._old_buckets is None:
+            return
+
+        start = time.perf_counter() if self._stats is not None else 0.0
+
+        while bucket_count > 0 and self._old_buckets is not None:
+            bucket = self._old_buckets[self._migrate_index]
+
+            if bucket:
+                for node in bucket:
+                    index = node.hash_value % self._capacity
+                    self._bucket_at(index).insert(node.key, node.value, node.hash_value)
+                    self._check_chain(index)
+                    if self._bloom is not None:
+                        self._bloom.add(node.hash_value)
+
+            # Release the migrated bucket so the old table shrinks as the migration advances
+            self._old_buckets[self._migrate_index] = None
+            self._migrate_index += 1
+            bucket_count -= 1
+
+            if self._migrate_index == self._old_capacity:
+                self._old_buckets = None
+                self._old_capacity = 0
+                self._migrate_index = 0
+                if self._bloom is not None:
+                    self._bloom.drop_previous()
+
+        # Migration time is resize time spread over later operations
+        if self._stats is not None:
+            self._stats.add_resize_time(time.perf_counter() - start)
+
+    def _finish_resize(self) -> None:
+        """
+        Completes any incremental resize in progress.
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity - self._migrate_index)
+
+    def _bucket_at(self, index: int) -> LinkedList:
+        """
+        Returns the bucket of the current bucket array at index, creating it if it does not exist yet.
+        """
+        bucket = self._buckets[index]
+        if bucket is None:
+            bucket = LinkedList()
+            self._buckets[index] = bucket
+        return bucket
+
+    def _old_bucket_for(self, hash_value: int) -> LinkedList:
+        """
+        Returns the not yet migrated bucket of the old table for the given hash, or None.
+        """
+        if self._old_buckets is None:
+            return None
+
+        index = hash_value % self._old_capacity
+        if index < self._migrate_index:
+            return None
+        return self._old_buckets[index]
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Updates the key/value pair in the hash map using an already computed hash of the key, migrating a few old
+        buckets first. Reaching a load factor of 1 starts an incremental resize instead of a full rebuild.
+        """
+        self._migrate(self._migrate_per_operation)
+
+        # Check the load factor and start a resize if greater than or equal to 1
+        if self.table_load() >= 1:
+            self._finish_resize()
+            self._start_resize(grown_capacity(self._capacity))
+
+        if self._bloom is not None:
+            self._bloom.add(hash_value)
+
+        # A key stays in the old table until its bucket migrates, so the current bucket array only holds the keys of
+        # migrated buckets
+        in_old_table = self._old_buckets is not None and hash_value % self._old_capacity >= self._migrate_index
+        if in_old_table:
+            index = hash_value % self._old_capacity
+            if self._old_buckets[index] is None:
+                self._old_buckets[index] = LinkedList()
+            bucket = self._old_buckets[index]
+        else:
+            index = hash_value % self._capacity
+            bucket = self._bucket_at(index)
+
+        node = bucket.contains(key, hash_value)
+        existed = node is not None
+        if existed:
+            node.value = value
+        else:
+            bucket.insert(key, value, hash_value)
+            self._size += 1
+            self._modifications += 1
+
+            # Old buckets are not converted, since they are dropped once migrated
+            if not in_old_table:
+                self._check_chain(index)
+                bucket = self._buckets[index]
+
+        if self._stats is not None:
+            self._record_put(bucket, existed)
+
+        # Rehash with a seeded hash function if the chain is abnormally long
+        if self._flood_limit and bucket.length() > self._flood_limit:
+            self._reseed()
+
+    def _find_node(self, key: str, operation: str):
+        """
+        Returns the node holding the given key from either bucket array, or None if the key does not exist.
+        operation names the calling method in the recorded statistics.
+        """
+        self._migrate(self._migrate_per_operation)
+
+        hash_value = self._hash_function(key)
+
+        # Most missing keys are rejected by the Bloom filter without reading either bucket
+        if self._bloom is not None and not self._bloom.might_contain(hash_value):
+            return None
+
+        bucket = self._buckets[hash_value % self._capacity]
+        old_bucket = self._old_bucket_for(hash_value)
+
+        if self._stats is not None:
+            self._stats.record(operation, (bucket.length() if bucket else 0) +
+                               (old_bucket.length() if old_bucket else 0))
+
+        node = bucket.contains(key, hash_value) if bucket else None
+        if node is None and old_bucket:
+            node = old_bucket.contains(key, hash_value)
+
+        if node is None and self._bloom is not None:
+            self._bloom.record_false_positive()
+        return node
+
+    def _upsert_hashed(self, key: str, fn: callable, default: object, hash_value: int) -> object:
+        """
+        Implements upsert using an already computed hash of the key. An existing node is updated in place wherever
+        it is stored. A new key is added by _put_hashed, which may start an incremental resize.
+        """
+        self._migrate(self._migrate_per_operation)
+
+        bucket = self._buckets[hash_value % self._capacity]
+        old_bucket = self._old_bucket_for(hash_value)
+
+        node = bucket.contains(key, hash_value) if bucket else None
+        if node is None and old_bucket:
+            node = old_bucket.contains(key, hash_value)
+
+        if node is None:
+            value = fn(default)
+            self._put_hashed(key, value, hash_value)
+            return value
+
+        if self._stats is not None:
+            self._stats.record('upsert', (bucket.length() if bucket else 0) +
+                               (old_bucket.length() if old_bucket else 0))
+
+        node.value = fn(node.value)
+        return node.value
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes the capacity of the underlying dynamic array in a single step, completing any incremental resize
+        in progress first. See HashMap.resize_table.
+        """
+        self._finish_resize()
+        super().resize_table(new_capacity)
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the current bucket array
+        """
+        counter = 0
+
+        for index in range(self._capacity):
+            if self._buckets[index] is None or self._buckets[index].length() == 0:
+                counter += 1
+
+        return counter
+
+    def get(self, key: str):
+        """
+        Returns the value associated with the given key if the key exists in the hash map, otherwise None.
+        """
+        node = self._find_node(key, 'get')
+        if node:
+            return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False.
+        """
+        return self._find_node(key, 'contains_key') is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+        self._migrate(self._migrate_per_operation)
+
+        hash_value = self._hash_function(key)
+        bucket = self._buckets[hash_value % self._capacity]
+        old_bucket = self._old_bucket_for(hash_value)
+
+        if self._stats is not None:
+            self._stats.record('remove', (bucket.length() if bucket else 0) +
+                               (old_bucket.length() if old_bucket else 0))
+
+        if bucket and bucket.remove(key, hash_value):
+            self._size -= 1
+            self._modifications += 1
+            self._check_chain(hash_value % self._capacity)
+        elif old_bucket and old_bucket.remove(key, hash_value):
+            self._size -= 1
+            self._modifications += 1
+        else:
+            return
+
+        # Shrink incrementally, like growing, if the load factor dropped below the low-water mark
+        capacity = self._shrink_capacity()
+        if capacity:
+            self._finish_resize()
+            self._start_resize(capacity)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of each key/value pair stored in the hash map.
+        """
+        nodes = self._get_nodes()
+        da = DynamicArray()
+
+        for index in range(nodes.length()):
+            da.append((nodes[index].key, nodes[index].value))
+
+        return da
+
+    def _get_nodes(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing every node stored in both bucket arrays.
+        """
+        da = DynamicArray()
+
+        for index in range(self._capacity):
+            if self._buckets[index]:
+                for node in self._buckets[index]:
+                    da.append(node)
+
+        if self._old_buckets is not None:
+            for index in range(self._migrate_index, self._old_capacity):
+                if self._old_buckets[index]:
+                    for node in self._old_buckets[index]:
+                        da.append(node)
+
+        return da
+
+    def _entries(self):
+        """
+        Yields (key, value, hash_value) for every key/value pair stored in the hash map, one bucket at a time: first
+        the buckets of the old table not migrated yet, last to first, then the current bucket array. An incremental
+        resize in progress is left to advance as usual. Lookups made while the generator is suspended may migrate old
+        buckets from the first one up. The old buckets are read down to the first migrated one, so the buckets read
+        from the old table are the ones from position boundary on, and their keys are skipped in the current bucket
+        array.
+        """
+        old_buckets = self._old_buckets
+        old_capacity = self._old_capacity
+        boundary = old_capacity
+
+        if old_buckets is not None:
+            for index in range(old_capacity - 1, self._migrate_index - 1, -1):
+                # The buckets below a migrated one have migrated too, and are read in the current bucket array
+                if self._old_buckets is not old_buckets or index < self._migrate_index:
+                    break
+                boundary = index
+                if old_buckets[index]:
+                    for node in list(old_buckets[index]):
+                        yield node.key, node.value, node.hash_value
+
+        for index in range(self._capacity):
+            if self._buckets[index]:
+                for node in list(self._buckets[index]):
+                    if old_buckets is None or node.hash_value % old_capacity < boundary:
+                        yield node.key, node.value, node.hash_value
+
+    def _empty_copy_steps(self, capacity: int, chunk_size: int):
+        """
+        Generator yielding the same map as _empty_copy(capacity) in a single step. Its buckets are created lazily, so
+        the new bucket array only holds None.
+        """
+        hash_map = self._empty_copy(1)
+        capacity = self._next_prime(capacity)
+
+        hash_map._buckets = DynamicArray([None] * capacity)
+        hash_map._capacity = capacity
+        if hash_map._bloom is not None:
+            hash_map._bloom = hash_map._bloom.cleared(capacity)
+        yield hash_map
+
+    def snapshot(self, path: str) -> None:
+        """
+        Completes any incremental resize in progress and writes the hash map to a binary file.
+        See HashMap.snapshot.
+        """
+        self._finish_resize()
+
+        # Create the buckets not used yet, so every bucket has a chain to record
+        for index in range(self._capacity):
+            self._bucket_at(index)
+        super().snapshot(path)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, abandoning any incremental resize in progress.
+        It does not change the underlying hash table capacity.
+        """
+        super().clear()
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
 
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
@@ -333,6 +1380,217 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     return mode_array, frequency
 
 
+class ModeCounter:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1) -> None:
+        """
+        Initialize a frequency counter for streaming mode computation.
+
+        Elements are counted one at a time as they arrive, so the input never has to be held in memory. Each element
+        is hashed once, and the running mode is kept up to date as counts change, so mode() needs no final scan.
+        """
+        self._map = HashMap(capacity, function)
+        self._modes = DynamicArray()
+        self._frequency = 0
+
+    def add(self, element: str) -> None:
+        """
+        Counts one occurrence of element
+        """
+        hash_value = self._map._hash_function(element)
+        node = self._map._buckets[hash_value % self._map._capacity].contains(element, hash_value)
+
+        # Update an existing count in place, otherwise add the element with a count of 1
+        if node:
+            node.value += 1
+            count = node.value
+        else:
+            self._map._put_hashed(element, 1, hash_value)
+            count = 1
+
+        # Counts grow by one at a time, so an element becomes a mode exactly when its count reaches the frequency
+        if count > self._frequency:
+            self._modes = DynamicArray()
+            self._modes.append(element)
+            self._frequency = count
+        elif count == self._frequency:
+            self._modes.append(element)
+
+    def update(self, elements) -> None:
+        """
+        Counts every element of an iterable, generator or dynamic array
+        """
+        if isinstance(elements, DynamicArray):
+            da = elements
+            elements = (da[index] for index in range(da.length()))
+
+        add = self.add
+        for element in elements:
+            add(element)
+
+    def count(self, element: str) -> int:
+        """
+        Returns the number of times element has been counted
+        """
+        return self._map.get(element) or 0
+
+    def mode(self) -> tuple[DynamicArray, int]:
+        """
+        Returns a tuple containing a dynamic array of the mode value(s) counted so far, and their frequency
+        """
+        return DynamicArray([self._modes[index] for index in range(self._modes.length())]), self._frequency
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Returns a dynamic array of the k most frequent (element, count) tuples, most frequent first.
+        Only k candidates are kept in a heap while scanning the counts.
+        """
+        map = self._map
+        nodes = (node for index in range(map.get_capacity()) for node in map._buckets[index])
+        return DynamicArray([(node.key, node.value) for node in heapq.nlargest(k, nodes, key=lambda node: node.value)])
+
+
+def find_mode_stream(elements, function: callable = hash_function_1) -> tuple[DynamicArray, int]:
+    """
+    Returns the same result as find_mode, but accepts any iterable or generator of strings and reads it once,
+    hashing each element once. The mode values are in the order they reached the highest frequency.
+
+    Args:
+        elements: iterable, generator or dynamic array of strings with at least one element
+        function: hash function used by the counting HashMap
+
+    Returns:
+        mode: tuple - first element of the tuple is a dynamic array containing the mode value(s)
+                      second element of the tuple is the frequency of the mode value(s)
+    """
+    counter = ModeCounter(function=function)
+    counter.update(elements)
+    return counter.mode()
+
+
+def _count_partition(tasks, results, index: int, function: callable) -> None:
+    """
+    Counts the chunks of one partition read from tasks until None arrives, then puts the tuple
+    (index, mode values as a list, frequency) on results. Runs in a worker process.
+    """
+    counter = ModeCounter(function=function)
+    for chunk in iter(tasks.get, None):
+        counter.update(chunk)
+
+    mode, frequency = counter.mode()
+    results.put((index, [mode[position] for position in range(mode.length())], frequency))
+
+
+def _check_workers(processes: list) -> None:
+    """
+    Raises RuntimeError if any worker process has failed
+    """
+    for process in processes:
+        if process.exitcode not in (None, 0):
+            raise RuntimeError("find_mode_parallel worker exited with code " + str(process.exitcode))
+
+
+def _send_chunk(tasks, chunk, processes: list) -> None:
+    """
+    Puts chunk on the task queue of a worker, waiting while the queue is full. Raises RuntimeError if a worker fails
+    meanwhile.
+    """
+    while True:
+        try:
+            tasks.put(chunk, timeout=1)
+            return
+        except queue.Full:
+            _check_workers(processes)
+
+
+def find_mode_parallel(elements,
+                       workers: int = None,
+                       function: callable = hash_function_1,
+                       chunk_size: int = 100000) -> tuple[DynamicArray, int]:
+    """
+    Returns the same result as find_mode, counting the elements in several worker processes.
+
+    Elements are partitioned by Python's built-in string hash, so every occurrence of a value goes to the same worker
+    and the workers count disjoint sets of values. Each worker counts its partition in its own HashMap, in chunks of
+    chunk_size sent while the input is read, and returns only its mode values and their frequency. The modes of the
+    partitions with the highest frequency are combined. At most a few chunks per worker are held at a time, so the
+    input is never held in memory as a whole.
+
+    Args:
+        elements: iterable, generator or dynamic array of strings with at least one element
+        workers: number of worker processes, defaults to the number of CPUs
+        function: hash function used by the counting HashMaps. It must be picklable (a module level function).
+        chunk_size: number of elements sent to a worker at a time
+
+    Returns:
+        mode: tuple - first element of the tuple is a dynamic array containing the mode value(s)
+                      second element of the tuple is the frequency of the mode value(s)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if isinstance(elements, DynamicArray):
+        da = elements
+        elements = (da[index] for index in range(da.length()))
+
+    if workers <= 1:
+        return find_mode_stream(elements, function)
+
+    # Each partition has its own worker, so its counts stay in that process. A full task queue makes the parent wait
+    tasks = [multiprocessing.Queue(2) for _ in range(workers)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_count_partition, args=(tasks[index], results, index, function),
+                                         daemon=True)
+                 for index in range(workers)]
+
+    try:
+        for process in processes:
+            process.start()
+
+        # Partition with the built-in hash, which runs in C, so the parent process never runs the interpreted function
+        chunks = [[] for _ in range(workers)]
+        for element in elements:
+            index = hash(element) % workers
+            chunk = chunks[index]
+            chunk.append(element)
+            if len(chunk) >= chunk_size:
+                _send_chunk(tasks[index], chunk, processes)
+                chunks[index] = []
+
+        for index in range(workers):
+            if chunks[index]:
+                _send_chunk(tasks[index], chunks[index], processes)
+            _send_chunk(tasks[index], None, processes)
+
+        partitions = []
+        while len(partitions) < workers:
+            try:
+                partitions.append(results.get(timeout=1))
+            except queue.Empty:
+                _check_workers(processes)
+
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    # Keep the modes of every partition that reached the highest frequency, in partition order
+    mode_array = DynamicArray()
+    frequency = 0
+    for _, partition_mode, partition_frequency in sorted(partitions):
+        if partition_frequency > frequency:
+            mode_array = DynamicArray(partition_mode)
+            frequency = partition_frequency
+        elif partition_frequency == frequency and partition_frequency:
+            for value in partition_mode:
+                mode_array.append(value)
+
+    return mode_array, frequency
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -533,3 +1791,110 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nupsert / setdefault / increment example")
+    print("---------------------------------------")
+    m = HashMap(11, hash_function_1)
+    for word in ['apple', 'pear', 'apple', 'plum', 'apple']:
+        m.increment(word)
+    print(m.get('apple'), m.upsert('pear', lambda value: value * 10, 0), m.upsert('fig', lambda value: value + 1, 0))
+    print(m.setdefault('plum', 5), m.setdefault('kiwi', 5), m.get_size())
+
+    print("\nkeys(), values(), items() example")
+    print("--------------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(5):
+        m.put('str' + str(i), i)
+    print(sorted(m.keys()), sorted(m.values()), sorted(m.items())[:2])
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print('RuntimeError:', error)
+
+    print("\nSortedBucket example")
+    print("--------------------")
+    m = HashMap(11, hash_function_1)
+    for i, word in enumerate(['abcdefghi', 'bacdefghi', 'cabdefghi', 'dabcefghi', 'eabcdfghi', 'fabcdeghi',
+                              'gabcdefhi', 'habcdefgi', 'iabcdefgh']):
+        m.put(word, i)
+    index = hash_function_1('abcdefghi') % m.get_capacity()
+    print(type(m._buckets[index]).__name__, m._buckets[index].length(), m.get('fabcdeghi'), m.get('ihgfedcba'))
+    for word in ['abcdefghi', 'bacdefghi', 'cabdefghi', 'dabcefghi']:
+        m.remove(word)
+    print(type(m._buckets[index]).__name__, m._buckets[index].length(), m.get_size())
+
+    print("\nenable_shrink example")
+    print("---------------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_shrink(0.25, 11)
+    for i in range(200):
+        m.put('str' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    for i in range(195):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get('str199'))
+
+    print("\nenable_flood_protection example")
+    print("-------------------------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_flood_protection(4)
+    words = ['abcdef', 'bacdef', 'cabdef', 'dabcef', 'eabcdf', 'fabcde', 'abcdfe', 'abcedf']
+    for i, word in enumerate(words):
+        m.put(word, i)
+    print(m.stats()['reseeds'] > 0, m.get_size(), [m.get(word) for word in words] == list(range(len(words))))
+
+    print("\nenable_adaptive_hashing example")
+    print("-------------------------------")
+    # Anagrams all have the same hash_function_1 hash, so another function is chosen once enough keys are sampled
+    m = HashMap(11, hash_function_1)
+    m.enable_adaptive_hashing(sample_size=100)
+    words = [''.join(letters) for letters in itertools.permutations('abcdef')]
+    for i, word in enumerate(words):
+        m.put(word, i)
+    print(m._hash_function.__name__ != 'hash_function_1', m.stats()['hash_switches'] > 0, m.get('fedcba'),
+          m.get_size())
+
+    print("\nenable_bloom_filter example")
+    print("---------------------------")
+    m = HashMap(11, hash_function_1)
+    m.enable_bloom_filter()
+    for i in range(100):
+        m.put('str' + str(i), i)
+    print(m.get('str7'), m.contains_key('str99'), sum(m.contains_key('missing' + str(i)) for i in range(100)) < 10)
+
+    print("\nsnapshot / restore example")
+    print("--------------------------")
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(), 'map.snapshot')
+    m = HashMap(11, hash_function_1)
+    for i in range(50):
+        m.put('str' + str(i), i * 10)
+    m.snapshot(path)
+    restored = HashMap.restore(path)
+    print(restored.get_size(), restored.get_capacity(), restored.get('str49'), restored.get('str50'))
+    os.remove(path)
+
+    print("\nIncrementalHashMap example")
+    print("--------------------------")
+    m = IncrementalHashMap(11, hash_function_1, migrate_per_operation=2)
+    resizing = 0
+    for i in range(100):
+        m.put('str' + str(i), i)
+        resizing += m.is_resizing()
+    print(m.get_size(), m.get_capacity(), resizing > 0, m.get('str0'), m.get('str99'))
+    print(len(list(m.keys())), sorted(m.values()) == list(range(100)))
+
+    print("\nModeCounter example")
+    print("-------------------")
+    counter = ModeCounter()
+    counter.update(["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu", "Ubuntu", "Ubuntu"])
+    mode, frequency = counter.mode()
+    print(mode, frequency, counter.count("Manjaro"), counter.count("Debian"), counter.top_k(2).length())
+
+    print("\nfind_mode_parallel example")
+    print("--------------------------")
+    for case in test_cases:
+        mode, frequency = find_mode_parallel(case, workers=2, chunk_size=4)
+        print(f"Input: {case}\nMode : {sorted(mode[index] for index in range(mode.length()))}, "
+              f"Frequency: {frequency}")
@@ -0,0 +1,126 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Binary snapshot file format shared by the snapshot() and restore() methods of the HashMaps.
+#
+#              A snapshot records the capacity, the hash function and the exact bucket layout of a map together with
+#              the cached hash of every entry, so restore() rebuilds the same table without calling the hash function
+#              or resizing.
+#
+#              File format (all integers little-endian):
+#
+#              header   64 bytes: magic b'HMAPSNP1', layout kind (8 bytes, ascii, zero padded), capacity (u64),
+#                                 entry count (u64), layout length (u64), hash function name (24 bytes, utf-8, zero
+#                                 padded)
+#              layout   layout length bytes describing the buckets. Its meaning depends on the layout kind:
+#                       'sc' - one u32 chain length per bucket
+#                       'oa', 'rh', 'pow2', 'swiss' - one byte per slot: 0 empty, 1 live, 2 tombstone
+#                       'cuckoo' - one byte per slot of both tables: 0 empty, 1 live, then one byte 1 per stashed
+#                                  entry
+#              hashes   entry count u64 hashes, in the order the layout lists the entries
+#              entries  pickled (keys, values) lists, in the same order
+#
+#              It includes the following public functions:
+#
+#              write_snapshot(path, kind, capacity, function, layout, hashes, keys, values) - Writes a snapshot
+#              read_snapshot(path, kind) - Returns (capacity, function, layout, hashes, keys, values) from a snapshot
+#              array_to_bytes(values) - Returns the items of an integer array as little-endian bytes
+#              array_from_bytes(typecode, data) - Returns an integer array read from little-endian bytes
+
+import pickle
+import struct
+import sys
+from array import array
+
+from hash_functions import HASH_FUNCTIONS, hash_function_name
+
+_MAGIC = b'HMAPSNP1'
+_HEADER = struct.Struct('<8s8sQQQ24s')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def array_to_bytes(values: array) -> bytes:
+    """
+    Returns the items of an integer array as little-endian bytes, whatever the byte order of the host
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def array_from_bytes(typecode: str, data: bytes) -> array:
+    """
+    Returns an array of the given typecode holding the little-endian integers in data, in the byte order of the host
+    """
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def write_snapshot(path: str, kind: str, capacity: int, function: callable, layout: bytes,
+                   hashes: array, keys: list, values: list) -> None:
+    """
+    Writes a snapshot of one hash table to path.
+
+    Args:
+        path: str - file to create or overwrite
+        kind: str - layout kind, which restore() checks before trusting the layout
+        capacity: int - capacity of the table
+        function: callable - hash function of the table. It must be registered in HASH_FUNCTIONS.
+        layout: bytes - bucket layout, see the module description
+        hashes: array('Q') - cached hash of each entry
+        keys: list - key of each entry
+        values: list - value of each entry
+    """
+    function_name = hash_function_name(function)
+    if function_name is None:
+        raise SnapshotError("only hash functions registered in hash_functions.HASH_FUNCTIONS can be stored")
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, kind.encode(), capacity, len(keys), len(layout), function_name.encode()))
+        file.write(layout)
+        file.write(array_to_bytes(hashes))
+        pickle.dump((keys, values), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path: str, kind: str) -> tuple:
+    """
+    Reads a snapshot written by write_snapshot.
+
+    Args:
+        path: str - snapshot file
+        kind: str - expected layout kind
+
+    Returns:
+        snapshot: tuple - (capacity, function, layout, hashes, keys, values), as given to write_snapshot
+    """
+    with open(path, 'rb') as file:
+        header = file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise SnapshotError(f"{path} is not a hash map snapshot")
+
+        magic, stored_kind, capacity, count, layout_length, function_name = _HEADER.unpack(header)
+        if magic != _MAGIC:
+            raise SnapshotError(f"{path} is not a hash map snapshot")
+
+        stored_kind = stored_kind.rstrip(b'\0').decode()
+        if stored_kind != kind:
+            raise SnapshotError(f"{path} holds a '{stored_kind}' layout, not '{kind}'")
+
+        function_name = function_name.rstrip(b'\0').decode()
+        if function_name not in HASH_FUNCTIONS:
+            raise SnapshotError(f"{path} uses unknown hash function {function_name}")
+
+        layout = file.read(layout_length)
+        hashes = array_from_bytes('Q', file.read(8 * count))
+        keys, values = pickle.load(file)
+
+    if len(layout) != layout_length or len(hashes) != count or len(keys) != count:
+        raise SnapshotError(f"{path} is truncated")
+
+    return capacity, HASH_FUNCTIONS[function_name], layout, hashes, keys, values
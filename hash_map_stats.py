@@ -0,0 +1,81 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Operation statistics shared by all HashMap implementations.
+#
+#              A map only records statistics after enable_stats() has been called on it. While disabled, each
+#              operation pays a single "is None" check. The statistics are returned by the map's stats() method.
+#
+#              Probe length means the number of buckets an open addressing operation visited. For separate chaining
+#              maps it is the length of the chain in the bucket the operation searched.
+
+
+class MapStats:
+    """
+    Collects probe length histograms, resize counters and collision counts for one HashMap
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        self._operations = {}
+        self._histogram = {}
+        self._resizes = 0
+        self._resize_seconds = 0.0
+        self._inserts = 0
+        self._collisions = 0
+
+    def record(self, operation: str, probes: int) -> None:
+        """Record one operation that visited the given number of buckets or chain nodes."""
+        counters = self._operations.get(operation)
+        if counters is None:
+            counters = self._operations[operation] = [0, 0, 0]
+        counters[0] += 1
+        counters[1] += probes
+        if probes > counters[2]:
+            counters[2] = probes
+
+        self._histogram[probes] = self._histogram.get(probes, 0) + 1
+
+    def record_insert(self, collided: bool) -> None:
+        """Record the insertion of a new key, and whether its home bucket was already in use."""
+        self._inserts += 1
+        if collided:
+            self._collisions += 1
+
+    def record_resize(self, seconds: float) -> None:
+        """Record one resize that took the given number of seconds."""
+        self._resizes += 1
+        self._resize_seconds += seconds
+
+    def add_resize_time(self, seconds: float) -> None:
+        """Add time spent resizing without counting a new resize, for resizes done in several steps."""
+        self._resize_seconds += seconds
+
+    def report(self) -> dict:
+        """
+        Returns the recorded statistics.
+
+        Returns:
+            report: dict - operations (count, average and max probes per operation name), probe_histogram
+                           (probe length -> number of operations), resizes, resize_seconds, inserts and
+                           collision_rate (share of inserts whose home bucket was already in use)
+        """
+        return {
+            'operations': {
+                operation: {
+                    'count': count,
+                    'average_probes': total / count,
+                    'max_probes': longest,
+                }
+                for operation, (count, total, longest) in self._operations.items()
+            },
+            'probe_histogram': dict(sorted(self._histogram.items())),
+            'resizes': self._resizes,
+            'resize_seconds': self._resize_seconds,
+            'inserts': self._inserts,
+            'collision_rate': self._collisions / self._inserts if self._inserts else 0.0,
+        }
+
@@ -0,0 +1,221 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: This module implements a compact Hash Map using open addressing with control bytes and group probing,
+#              in the style of a Swiss table.
+#
+#              Next to the flat arrays of hash_map_compact.CompactHashMap, every slot has a control byte: EMPTY,
+#              DELETED, or a 7-bit tag taken from the top bits of the key's hash. Slots are probed in aligned groups
+#              of GROUP_WIDTH. Within a group, bytearray.find locates the slots whose control byte equals the tag of
+#              the key, so stored hashes and keys are only compared on a tag match, about one slot in 128 otherwise.
+#              A group holding an EMPTY byte ends the probe sequence. Groups are visited by triangular probing, which
+#              with a power of two number of groups reaches every group.
+#
+#              SwissHashMap has the same public methods, resize rules and iterator as
+#              hash_map_pow2.PowerOfTwoHashMap. Its capacity is a power of two of at least GROUP_WIDTH.
+
+from a6_include import hash_function_1
+from hash_functions import hash_function_fnv1a
+from hash_map_compact import _LIVE, _TOMBSTONE, _HASH_MASK
+from hash_map_pow2 import PowerOfTwoHashMap
+
+# Control bytes of slots without a live entry. Live slots hold the 7-bit tag of their hash, from 0 to 127
+_CTRL_EMPTY = 0x80
+_CTRL_DELETED = 0xFE
+
+# Odd 64-bit multiplier spreading every bit of a hash into the top 7 bits used as its tag
+_TAG_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _tag(hash_value: int) -> int:
+    """
+    Returns the 7-bit tag stored in the control byte of a slot holding hash_value
+    """
+    return (hash_value * _TAG_MULTIPLIER & _HASH_MASK) >> 57
+
+
+class SwissHashMap(PowerOfTwoHashMap):
+    # Control bytes are rebuilt from the stored hashes, but group probing places entries differently
+    _SNAPSHOT_KIND = 'swiss'
+
+    # Number of slots probed together
+    GROUP_WIDTH = 16
+
+    @classmethod
+    def _round_capacity(cls, capacity: int) -> int:
+        """
+        Returns the capacity resize_table uses for a proposed capacity. It must be a power of two holding at least one
+        whole group, so any other capacity is changed to the next such power of two.
+        """
+        return max(cls.GROUP_WIDTH, PowerOfTwoHashMap._round_capacity(capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the parallel arrays and the control bytes with empty arrays of the given capacity
+        """
+        super()._allocate(capacity)
+        self._control = bytearray([_CTRL_EMPTY]) * capacity
+
+    def _find(self, key: str, hash_value: int, operation: str) -> int:
+        """
+        Returns the index of the live slot holding key, or -1 if the key does not exist in the hash map.
+        operation names the calling method in the recorded statistics, which count probed groups.
+        """
+        control, hashes, keys = self._control, self._hashes, self._keys
+        width = self.GROUP_WIDTH
+        mask = self._capacity - 1
+        tag = _tag(hash_value)
+        group = hash_value & mask & -width
+        probe = 1
+
+        # Triangular probing visits every group once in as many probes as there are groups
+        while probe <= self._capacity // width:
+            end = group + width
+
+            # Compare keys only in the slots whose tag matches
+            index = control.find(tag, group, end)
+            while index >= 0:
+                if hashes[index] == hash_value and keys[index] == key:
+                    if self._stats is not None:
+                        self._stats.record(operation, probe)
+                    return index
+                index = control.find(tag, index + 1, end)
+
+            # A group with an empty slot ends the probe sequence
+            if control.find(_CTRL_EMPTY, group, end) >= 0:
+                if self._stats is not None:
+                    self._stats.record(operation, probe)
+                return -1
+
+            # Determine next group using triangular probing scheme
+            group = (group + width * probe) & mask
+            probe += 1
+
+        if self._stats is not None:
+            self._stats.record(operation, probe - 1)
+        return -1
+
+    # ------------------------------------------------------------------ #
+
+    def _probe(self, key: str, hash_value: int) -> tuple:
+        """
+        Walks the probe sequence of key group by group up to the first group holding an empty slot.
+
+        Returns:
+            result: tuple - (index, found, probe). If found is True, index is the live slot holding key. Otherwise
+                            it is the slot a new entry for key goes in: the first deleted slot passed, or else the
+                            first empty slot of the last group. probe is the number of groups visited.
+        """
+        control, hashes, keys = self._control, self._hashes, self._keys
+        width = self.GROUP_WIDTH
+        mask = self._capacity - 1
+        tag = _tag(hash_value)
+        group = hash_value & mask & -width
+        probe = 1
+        first_deleted = -1
+        index = -1
+
+        while probe <= self._capacity // width:
+            end = group + width
+
+            index = control.find(tag, group, end)
+            while index >= 0:
+                if hashes[index] == hash_value and keys[index] == key:
+                    return index, True, probe
+                index = control.find(tag, index + 1, end)
+
+            # Remember the first deleted slot on the probe sequence so a new key can reuse it
+            if first_deleted < 0:
+                first_deleted = control.find(_CTRL_DELETED, group, end)
+
+            index = control.find(_CTRL_EMPTY, group, end)
+            if index >= 0:
+                break
+
+            # Determine next group using triangular probing scheme
+            group = (group + width * probe) & mask
+            probe += 1
+
+        # The key is not in the table. Reuse the first deleted slot passed, or use the empty slot
+        if first_deleted >= 0:
+            return first_deleted, False, probe
+        if index < 0:
+            raise RuntimeError("no open bucket on the probe sequence of the key")
+        return index, False, probe
+
+    def _store(self, index: int, key: str, value: object, hash_value: int, probe: int, operation: str) -> None:
+        """
+        Stores the entry of a key that is not in the hash map at the slot _probe returned for it, and its tag in the
+        control byte of the slot. See CompactHashMap._store.
+        """
+        self._control[index] = _tag(hash_value)
+        super()._store(index, key, value, hash_value, probe, operation)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map.
+        If the key is not in the hash map, the method does nothing.
+        """
+        index = self._find(key, self._hash_function(key) & _HASH_MASK, 'remove')
+        if index < 0:
+            return
+
+        # Mark the slot deleted and release the references held by it
+        self._states[index] = _TOMBSTONE
+        self._control[index] = _CTRL_DELETED
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+        self._modifications += 1
+
+        # Shrink the table if the load factor dropped below the low-water mark. Otherwise compact the table once
+        # tombstones take up too much of it
+        capacity = self._shrink_capacity()
+        if capacity:
+            self.resize_table(capacity)
+        elif self._tombstones >= self.TOMBSTONE_THRESHOLD * self._capacity:
+            self.compact()
+
+    @classmethod
+    def restore(cls, path: str) -> "SwissHashMap":
+        """
+        Returns a new hash map with the exact slot layout stored by snapshot(), rebuilding the control bytes from the
+        stored hashes. See HashMap.restore.
+        """
+        hash_map = super().restore(path)
+
+        states, hashes, control = hash_map._states, hash_map._hashes, hash_map._control
+        for index in range(hash_map._capacity):
+            if states[index] == _LIVE:
+                control[index] = _tag(hashes[index])
+            elif states[index] == _TOMBSTONE:
+                control[index] = _CTRL_DELETED
+
+        return hash_map
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get / remove example")
+    print("--------------------------")
+    m = SwissHashMap(50, hash_function_fnv1a)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    m.put('str0', 'overwritten')
+    m.remove('str1')
+    print(m.get('str0'), m.get('str1'), m.contains_key('str2'), m.get_size(), m.stats()['tombstones'])
+
+    print("\nprobed groups example")
+    print("---------------------")
+    for function in (hash_function_1, hash_function_fnv1a):
+        m = SwissHashMap(16, function)
+        m.enable_stats()
+        for i in range(1000):
+            m.put('str' + str(i), i)
+        for i in range(1000):
+            m.get('str' + str(i))
+        print(function.__name__, m.get_capacity(), m.stats()['operations']['get'])